@@ -0,0 +1,335 @@
+import heapq
+
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch, ROW_BATCH_UNIQUE
+from decomposition import find_components
+
+
+# ## Motor de asignación combinatorio
+# Sin las restricciones de volumen el modelo es una b-asignación bipartita:
+# cada lote (fila de unicidad) se entrega a lo sumo una vez y cada cliente y
+# producto (fila de límite de despacho) recibe a lo sumo cierta cantidad de
+# lotes. Eso se resuelve con flujo en redes, sin solucionador MIP:
+#
+#   S ──(cap. fila de unicidad)──> lote ──(X_cb, costo -objetivo)──>
+#       cliente/producto ──(cap. fila de despacho)──> T
+#
+# Una fila de despacho se puede llevar a esta forma si no restringe (la suma
+# de todos sus volúmenes cabe en D_cp + sale_excess) o si todos sus lotes
+# tienen el mismo volumen V (entonces admite floor(rhs / V) lotes). Cada
+# componente conexa del modelo se clasifica por separado; solo las que tienen
+# alguna fila de volumen activa con volúmenes distintos van al MIP.
+
+EPSILON = 1e-9
+
+
+class FlowNetwork:
+    def __init__(self, nodes_count):
+        self.nodes_count = nodes_count
+        self.adjacency = [[] for _ in range(nodes_count)]
+        self.to = []
+        self.capacity = []
+        self.cost = []
+
+    # Agrega el arco y su reverso; devuelve la posición del arco directo.
+    def add_edge(self, source, target, capacity, cost=0.0):
+        edge = len(self.to)
+
+        self.adjacency[source].append(edge)
+        self.to.append(target)
+        self.capacity.append(capacity)
+        self.cost.append(cost)
+
+        self.adjacency[target].append(edge + 1)
+        self.to.append(source)
+        self.capacity.append(0)
+        self.cost.append(-cost)
+
+        return edge
+
+    def flow(self, edge):
+        return self.capacity[edge + 1]
+
+    # Flujo máximo (Dinic).
+    def max_flow(self, source, sink):
+        total = 0
+
+        while True:
+            level = [-1] * self.nodes_count
+            level[source] = 0
+            queue = [source]
+
+            for node in queue:
+                for edge in self.adjacency[node]:
+                    target = self.to[edge]
+
+                    if self.capacity[edge] > 0 and level[target] < 0:
+                        level[target] = level[node] + 1
+                        queue.append(target)
+
+            if level[sink] < 0:
+                return total
+
+            pointer = [0] * self.nodes_count
+
+            while True:
+                pushed = self._blocking_path(source, sink, level, pointer)
+
+                if pushed == 0:
+                    break
+
+                total += pushed
+
+    def _blocking_path(self, source, sink, level, pointer):
+        path = []
+        node = source
+
+        while node != sink:
+            edges = self.adjacency[node]
+
+            while pointer[node] < len(edges):
+                edge = edges[pointer[node]]
+                target = self.to[edge]
+
+                if self.capacity[edge] > 0 and level[target] == level[node] + 1:
+                    break
+
+                pointer[node] += 1
+
+            else:
+                if not path:
+                    return 0
+
+                # Callejón sin salida: retrocede y descarta el arco.
+                level[node] = -1
+                edge = path.pop()
+                node = self.to[edge ^ 1]
+                pointer[node] += 1
+                continue
+
+            path.append(edge)
+            node = target
+
+        pushed = min(self.capacity[edge] for edge in path)
+
+        for edge in path:
+            self.capacity[edge] -= pushed
+            self.capacity[edge ^ 1] += pushed
+
+        return pushed
+
+    # Flujo de costo mínimo sin exigir flujo máximo: aumenta por caminos más
+    # cortos (Dijkstra con potenciales) mientras el costo del camino sea
+    # negativo. `potential` debe ser factible para los costos iniciales.
+    def min_cost_flow(self, source, sink, potential):
+        total_cost = 0.0
+
+        while True:
+            distance = [float("inf")] * self.nodes_count
+            previous = [-1] * self.nodes_count
+            distance[source] = 0.0
+            heap = [(0.0, source)]
+
+            while heap:
+                node_distance, node = heapq.heappop(heap)
+
+                if node_distance > distance[node]:
+                    continue
+
+                for edge in self.adjacency[node]:
+                    if self.capacity[edge] <= 0:
+                        continue
+
+                    target = self.to[edge]
+                    candidate = (node_distance + self.cost[edge]
+                                 + potential[node] - potential[target])
+
+                    if candidate < distance[target] - EPSILON:
+                        distance[target] = candidate
+                        previous[target] = edge
+                        heapq.heappush(heap, (candidate, target))
+
+            if distance[sink] == float("inf"):
+                return total_cost
+
+            path_cost = distance[sink] + potential[sink] - potential[source]
+
+            if path_cost >= -EPSILON:
+                return total_cost
+
+            for node in range(self.nodes_count):
+                if distance[node] < float("inf"):
+                    potential[node] += distance[node]
+
+            path = []
+            node = sink
+
+            while node != source:
+                edge = previous[node]
+                path.append(edge)
+                node = self.to[edge ^ 1]
+
+            pushed = min(self.capacity[edge] for edge in path)
+
+            for edge in path:
+                self.capacity[edge] -= pushed
+                self.capacity[edge ^ 1] += pushed
+
+            total_cost += pushed * path_cost
+
+
+# ------------------------------------------------------------
+
+# Capacidad de cada fila en número de unidades de columna, o None si la fila
+# es de volumen activa con coeficientes distintos o tiene coeficientes
+# negativos (simetría); esas no se pueden llevar a flujo. Las filas que no
+# restringen devuelven infinito.
+def row_capacities(model):
+    capacities = []
+
+    for row in range(model.constraints_count):
+        indices, data = model.row(row)
+        rhs = model.rhs[row]
+
+        if np.any(data < 0):
+            capacities.append(None)
+
+        elif float(data @ model.upper[indices]) <= rhs + EPSILON:
+            capacities.append(float("inf"))
+
+        elif np.all(data == data[0]) and data[0] > 0:
+            capacities.append(float(np.floor(rhs / data[0] + EPSILON)))
+
+        else:
+            capacities.append(None)
+
+    return capacities
+
+
+# Resuelve por flujo las columnas `columns` (una o más componentes sin filas
+# de volumen activas) y devuelve sus valores.
+def solve_by_flow(model, columns, capacities):
+    submodel = model.restrict(columns)
+    row_ids = _restricted_rows(model, columns)
+    row_capacity = [capacities[row] for row in row_ids]
+
+    # Nodos: 0 = S, 1 = T, 2 + fila.
+    source, sink = 0, 1
+    network = FlowNetwork(2 + submodel.constraints_count)
+
+    column_rows = [[None, None] for _ in range(submodel.variables_count)]
+
+    for row in range(submodel.constraints_count):
+        indices, _ = submodel.row(row)
+        side = 0 if submodel.row_kind[row] == ROW_BATCH_UNIQUE else 1
+
+        for col in indices.tolist():
+            column_rows[col][side] = row
+
+    for row, capacity in enumerate(row_capacity):
+        if capacity == float("inf"):
+            capacity = int(submodel.upper[submodel.row(row)[0]].sum())
+
+        if submodel.row_kind[row] == ROW_BATCH_UNIQUE:
+            network.add_edge(source, 2 + row, int(capacity))
+        else:
+            network.add_edge(2 + row, sink, int(capacity))
+
+    objective = submodel.objective.tolist()
+    upper = submodel.upper.tolist()
+    column_edges = []
+
+    for col, (left, right) in enumerate(column_rows):
+        column_edges.append(network.add_edge(
+            source if left is None else 2 + left,
+            sink if right is None else 2 + right,
+            int(upper[col]),
+            -objective[col]
+        ))
+
+    if len(set(objective)) <= 1 and (not objective or objective[0] > 0):
+        # Objetivo uniforme y positivo: basta con el flujo máximo.
+        network.max_flow(source, sink)
+
+    else:
+        # Potenciales iniciales: la red es acíclica (S -> unicidad -> despacho
+        # -> T), así que basta con propagar distancias en ese orden.
+        potential = [0.0] * network.nodes_count
+
+        for col, (left, right) in enumerate(column_rows):
+            target = sink if right is None else 2 + right
+            potential[target] = min(potential[target], -objective[col])
+
+        potential[sink] = min(potential[2:] + [potential[sink]])
+
+        network.min_cost_flow(source, sink, potential)
+
+    return np.array([network.flow(edge) for edge in column_edges], dtype=float)
+
+
+def _restricted_rows(model, columns):
+    mask = np.zeros(model.variables_count, dtype=bool)
+    mask[columns] = True
+
+    row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+    return np.unique(row_of_entry[mask[model.indices]]).tolist()
+
+
+# ------------------------------------------------------------
+
+# Backend "flow": componentes relajables por flujo en redes y el resto por
+# MIP con `fallback_backend`.
+def solve_with_assignment_engine(model, fallback_backend="cbc", time_limit=5,
+                                 initial_values=None, **fallback_options):
+    from model_backends import solve_model
+
+    stopwatch = Stopwatch()
+
+    labels = find_components(model)
+    capacities = row_capacities(model)
+
+    row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+    knapsack_rows = np.array([capacity is None for capacity in capacities], dtype=bool)
+
+    mip_components = np.unique(labels[model.indices[knapsack_rows[row_of_entry]]])
+    mip_columns_mask = np.isin(labels, mip_components)
+
+    flow_columns = np.flatnonzero(~mip_columns_mask)
+    mip_columns = np.flatnonzero(mip_columns_mask)
+
+    values = np.zeros(model.variables_count)
+    status = "Optimal"
+
+    if len(flow_columns):
+        values[flow_columns] = solve_by_flow(model, flow_columns, capacities)
+
+    # La parte resuelta por flujo es óptima; la cota suma la del MIP.
+    bound = float(model.objective @ values)
+
+    build_seconds = stopwatch.lap()
+
+    if len(mip_columns):
+        submodel = model.restrict(mip_columns)
+
+        if initial_values is not None:
+            fallback_options["initial_values"] = initial_values[mip_columns]
+
+        result = solve_model(submodel, fallback_backend, time_limit=time_limit,
+                             **fallback_options)
+        values[mip_columns] = result.values
+        status = result.status
+        bound = None if result.bound is None else bound + result.bound
+
+    components_count = int(labels.max()) + 1 if len(labels) else 0
+    print(f"[flow] Componentes: {components_count} | "
+          f"Columnas por flujo: {len(flow_columns)} | "
+          f"Columnas por MIP ({fallback_backend}): {len(mip_columns)}")
+
+    return SolveResult(backend="flow",
+                       status=status,
+                       objective=float(model.objective @ values),
+                       values=values,
+                       build_seconds=build_seconds,
+                       solve_seconds=stopwatch.lap(),
+                       bound=bound)
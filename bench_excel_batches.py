@@ -0,0 +1,67 @@
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from excel_batches import batches_from_dataframe, batches_from_dataframe_columnar
+
+
+# Hoja "Format" sintética con el mismo formato de columnas que STOCK.xlsx.
+def synthetic_stocks_dataframe(rows: int, clients: int = 13, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    arrived = rng.uniform(10, 600, rows).round(3)
+    in_transit = np.where(rng.random(rows) < 0.2, rng.uniform(10, 600, rows), 0.0).round(3)
+    mass = arrived + in_transit
+
+    data = {
+        "Nombre Centro": rng.choice(["PULP FLUSHING", "PULP BRAKE", "PULP MONFALCONE"], rows),
+        "Planta": rng.choice(["SANTA FE", "PACIFICO", "GUAIBA"], rows),
+        "Nave": rng.choice(["STAR MINERVA", "STAR LIVORNO"], rows),
+        "Fecha Nave": pd.Timestamp("2023-01-01")
+        + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "Lote": [f"{551000 + row}" for row in range(rows)],
+        "Material": rng.choice(["CC3029", "CC3129", "CC3429", "CC4929"], rows),
+        "Net Arrib (LU)": arrived,
+        "Net en Tráns": in_transit,
+    }
+
+    for client in range(clients):
+        data[18300 + client] = np.where(rng.random(rows) < 0.5, mass, np.nan)
+
+    return pd.DataFrame(data)
+
+
+def time_loader(loader, dataframe):
+    start = perf_counter()
+    batches = loader(dataframe)
+    return perf_counter() - start, batches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara la carga fila a fila de lotes contra la carga por columnas."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 50_000, 200_000])
+    parser.add_argument("--clients", type=int, default=13)
+    args = parser.parse_args()
+
+    print(f"{'filas':>8} | {'fila a fila (s)':>15} | {'columnas (s)':>12} | {'aceleración':>11}")
+
+    for rows in args.sizes:
+        dataframe = synthetic_stocks_dataframe(rows, args.clients)
+
+        row_seconds, row_batches = time_loader(batches_from_dataframe, dataframe)
+        col_seconds, col_batches = time_loader(batches_from_dataframe_columnar, dataframe)
+
+        assert row_batches.keys() == col_batches.keys()
+        assert all(row_batches[key].fields() == col_batches[key].fields() for key in row_batches)
+
+        print(f"{rows:>8} | {row_seconds:>15.3f} | {col_seconds:>12.3f} | "
+              f"{row_seconds / col_seconds:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import pulp
+
+from tables import Dataset
+from parameters import ModelParameters
+from model_builder import build_allocation_model
+from model_backends import build_pulp_problem
+from mps_writer import write_mps
+from synthetic_data import synthetic_raw_data
+
+
+# Tres formas de llegar al MPS del mismo modelo:
+#   original   construcción de model.pulp.py antes de `model_builder` (ver
+#              `original_pulp_problem`), con `writeMPS`;
+#   PuLP/CSR   `model_backends.build_pulp_problem` desde la matriz del
+#              modelo, con `writeMPS`;
+#   MPS        `mps_writer.write_mps` directo desde la matriz.
+
+
+# Tiempo (sin tracemalloc, que lo distorsiona) y pico de memoria en otra corrida.
+def measure(function):
+    start = perf_counter()
+    function()
+    seconds = perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak / 2 ** 20
+
+
+# Diccionarios completos de parámetros, como los armaba el script original
+# con `setdefault` (todas las combinaciones, aptas o no).
+def original_parameters(parameters):
+    clients, batches, products = parameters.clients, parameters.batches, parameters.products
+    matrix = parameters.aptitude.matrix.tolist()
+
+    A_cb = {(client, batch): int(matrix[c][b])
+            for c, client in enumerate(clients) for b, batch in enumerate(batches)}
+    V_b = {(batch, ): volume for batch, volume in zip(batches, parameters.volume.tolist())}
+    D_cp = {(client, product): parameters.demand[c, p].item()
+            for c, client in enumerate(clients) for p, product in enumerate(products)}
+
+    return clients, batches, products, A_cb, V_b, D_cp
+
+
+# Construcción original de model.pulp.py: variables densas con
+# `LpVariable.dicts`, una fila X_cb <= A_cb por par y `lpSum` sobre los
+# diccionarios (la fila de despacho suma todos los lotes, como en el
+# original).
+def original_pulp_problem(clients, batches, products, A_cb, V_b, D_cp, sale_excess=15):
+    model = pulp.LpProblem("Optimizacion_de_Distribucion", pulp.LpMaximize)
+
+    X_cb = pulp.LpVariable.dicts("X", ((client, batch)
+                                       for batch in batches
+                                       for client in clients),
+                                 cat=pulp.LpBinary)
+
+    for client in clients:
+        for batch in batches:
+            model += (X_cb[(client, batch)] <= A_cb[(client, batch)],
+                      f"Aptitud_{client}_{batch}")
+
+    for batch in batches:
+        model += (pulp.lpSum(X_cb[(client, batch)] for client in clients) <= 1,
+                  f"Unicidad_{batch}")
+
+    for client in clients:
+        for product in products:
+            model += (pulp.lpSum(X_cb[(client, batch)] * V_b[(batch, )] for batch in batches)
+                      <= D_cp[(client, product)] + sale_excess,
+                      f"Limite_{client}_{product}")
+
+    model += pulp.lpSum([X_cb[(c, b)] for c in clients for b in batches])
+
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara la construcción original de model.pulp.py (lpSum sobre "
+                    "diccionarios densos), la construcción con PuLP desde la matriz "
+                    "del modelo y la escritura directa del MPS."
+    )
+    parser.add_argument("--batches", type=int, nargs="+", default=[1_000, 5_000, 10_000])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--original-max-pairs", type=int, default=200_000,
+                        help="Pares cliente-lote máximos para medir la construcción "
+                             "original (crece con clientes × productos × lotes).")
+    args = parser.parse_args()
+
+    print(f"{'lotes':>7} | {'variables':>9} | {'no nulos':>9} | "
+          f"{'original (s)':>12} | {'original (MB)':>13} | "
+          f"{'PuLP/CSR (s)':>12} | {'PuLP/CSR (MB)':>13} | {'MPS (s)':>7} | {'MPS (MB)':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for batches_count in args.batches:
+            raw_data = synthetic_raw_data(batches_count, args.clients, args.products)
+            parameters = ModelParameters(Dataset(raw_data))
+            model = build_allocation_model(parameters, sale_excess=15)
+
+            def original_path():
+                problem = original_pulp_problem(*original_parameters(parameters))
+                problem.writeMPS(os.path.join(tmp_dir, "original.mps"))
+
+            def pulp_path():
+                problem, _ = build_pulp_problem(model)
+                problem.writeMPS(os.path.join(tmp_dir, "pulp.mps"))
+
+            def matrix_path():
+                write_mps(build_allocation_model(parameters, sale_excess=15),
+                          os.path.join(tmp_dir, "matrix.mps"))
+
+            if len(parameters.clients) * len(parameters.batches) <= args.original_max_pairs:
+                original_seconds, original_mb = measure(original_path)
+                original = f"{original_seconds:>12.2f} | {original_mb:>13.1f}"
+            else:
+                original = f"{'-':>12} | {'-':>13}"
+
+            pulp_seconds, pulp_mb = measure(pulp_path)
+            matrix_seconds, matrix_mb = measure(matrix_path)
+
+            print(f"{batches_count:>7} | {model.variables_count:>9} | {model.nonzeros:>9} | "
+                  f"{original} | {pulp_seconds:>12.2f} | {pulp_mb:>13.1f} | "
+                  f"{matrix_seconds:>7.2f} | {matrix_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import tracemalloc
+from collections import defaultdict
+from time import perf_counter
+
+import numpy as np
+
+from excel_batches import batches_from_dataframe_columnar
+from tables import get_all_batches, get_all_clients, get_compatibility_matrix
+from bench_excel_batches import synthetic_stocks_dataframe
+
+
+# Representación anterior, como referencia: objetos con __dict__ y un
+# defaultdict(bool) de clientes por lote.
+class DictBatch:
+    def __init__(self, batch):
+        self.center_name = batch.center_name
+        self.mill = batch.mill
+        self.shipping_date_epoch = batch.shipping_date_epoch
+        self.batch_id = batch.batch_id
+        self.product_id = batch.product_id
+        self.mass = batch.mass
+        self.sellable_clients = defaultdict(bool, batch.sellable_clients.items())
+
+
+def dict_compatibility_matrix(batches_data, clients, batches):
+    client_index = {client: index for index, client in enumerate(clients)}
+    rows = []
+    cols = []
+
+    for col, batch in enumerate(batches):
+        for client, sellable in batches_data[batch].sellable_clients.items():
+            if sellable:
+                rows.append(client_index[client])
+                cols.append(col)
+
+    matrix = np.zeros((len(clients), len(batches)), dtype=bool)
+    matrix[rows, cols] = True
+    return matrix
+
+
+def traced_peak(function):
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, peak
+
+
+def seconds(function):
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memoria por lote y tiempo de las tablas con lotes compactos "
+                    "(__slots__ y máscara de aptitud) contra objetos con "
+                    "diccionarios."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--clients", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'lotes':>7} | {'dict (B/lote)':>13} | {'compacto (B/lote)':>17} | "
+          f"{'dict tablas (s)':>15} | {'compacto tablas (s)':>19}")
+
+    for rows in args.sizes:
+        dataframe = synthetic_stocks_dataframe(rows, args.clients)
+
+        # El pico compacto incluye los temporales del cargador; el de la
+        # versión con diccionarios, solo sus objetos.
+        compact, compact_peak = traced_peak(lambda: batches_from_dataframe_columnar(dataframe))
+        legacy, legacy_peak = traced_peak(
+            lambda: {key: DictBatch(batch) for key, batch in compact.items()}
+        )
+
+        batches = get_all_batches(compact)
+        clients = get_all_clients(compact, {})
+
+        legacy_seconds = seconds(lambda: dict_compatibility_matrix(
+            legacy, get_all_clients(legacy, {}), batches))
+        compact_seconds = seconds(lambda: get_compatibility_matrix(
+            compact, {}, get_all_clients(compact, {}), batches))
+
+        assert (dict_compatibility_matrix(legacy, clients, batches)
+                == get_compatibility_matrix(compact, {}, clients, batches).matrix).all()
+
+        print(f"{rows:>7} | {legacy_peak / rows:>13.0f} | {compact_peak / rows:>17.0f} | "
+              f"{legacy_seconds:>15.3f} | {compact_seconds:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import os
+import shutil
+import tempfile
+from time import perf_counter
+
+import pandas as pd
+
+from tables import Dataset, get_raw_data
+from parameters import ModelParameters
+from model_builder import build_allocation_model
+from model_backends import solve_model
+from mps_writer import get_cbc_path
+from synthetic_data import synthetic_raw_data, write_synthetic_workbooks
+
+
+# Máxima cantidad de lotes que se intenta con cada backend: sobre ese tamaño
+# GEKKO (APOPT) y la construcción de Pyomo dejan de ser razonables.
+DEFAULT_LIMITS = {"gekko": 1_000, "pyomo": 10_000}
+
+
+def timed(function):
+    start = perf_counter()
+    result = function()
+    return result, perf_counter() - start
+
+
+# Opciones de cada backend: Pyomo usa GLPK si está instalado y, si no, el CBC
+# incluido con PuLP.
+def backend_options(backend, time_limit):
+    options = {"time_limit": time_limit}
+
+    if backend == "pyomo":
+        if shutil.which("glpsol") or os.environ.get("GLPSOL_PATH"):
+            options["solver_name"] = "glpk"
+        else:
+            options.update(solver_name="cbc", executable=get_cbc_path())
+
+    return options
+
+
+def parse_limits(values):
+    limits = dict(DEFAULT_LIMITS)
+
+    for value in values:
+        backend, _, limit = value.partition("=")
+        limits[backend] = int(limit)
+
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mide cada etapa (libros, parámetros, modelo) y cada backend "
+                    "sobre instancias sintéticas de distintos tamaños."
+    )
+    parser.add_argument("--batches", type=int, nargs="+",
+                        default=[100, 1_000, 5_000, 10_000, 50_000])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--backends", nargs="+", default=["pulp", "pyomo", "gekko"])
+    parser.add_argument("--limit", nargs="*", default=[],
+                        help="Máximo de lotes por backend, como backend=lotes.")
+    parser.add_argument("--time-limit", type=float, default=30)
+    parser.add_argument("--no-workbooks", action="store_true",
+                        help="No escribe ni lee los libros sintéticos.")
+    parser.add_argument("--output", default=None, help="CSV con los resultados.")
+    args = parser.parse_args()
+
+    limits = parse_limits(args.limit)
+    rows = []
+
+    def record(batches_count, stage, seconds, **extra):
+        rows.append({"batches": batches_count, "stage": stage,
+                     "seconds": round(seconds, 3), **extra})
+        details = " | ".join(f"{key}: {value}" for key, value in extra.items())
+        print(f"{batches_count:>7} | {stage:<18} | {seconds:>9.3f} s"
+              + (f" | {details}" if details else ""))
+
+    work_dir = tempfile.mkdtemp()
+
+    try:
+        for batches_count in args.batches:
+            raw_data = synthetic_raw_data(batches_count, args.clients, args.products)
+
+            if not args.no_workbooks:
+                paths, seconds = timed(lambda: write_synthetic_workbooks(
+                    raw_data, os.path.join(work_dir, str(batches_count))))
+                record(batches_count, "escribir libros", seconds)
+
+                raw_data, seconds = timed(lambda: get_raw_data(
+                    use_cache=False, paths=paths))
+                record(batches_count, "leer libros", seconds)
+
+                _, seconds = timed(lambda: get_raw_data(
+                    use_cache=False, parallel=True, paths=paths))
+                record(batches_count, "leer libros (par.)", seconds)
+
+            parameters, seconds = timed(lambda: ModelParameters(Dataset(raw_data)))
+            record(batches_count, "tablas/parámetros", seconds)
+
+            model, seconds = timed(lambda: build_allocation_model(parameters, sale_excess=15))
+            record(batches_count, "modelo", seconds,
+                   variables=model.variables_count, constraints=model.constraints_count)
+
+            for backend in args.backends:
+                if batches_count > limits.get(backend, batches_count):
+                    continue
+
+                result = solve_model(model, backend,
+                                     **backend_options(backend, args.time_limit))
+                record(batches_count, backend, result.build_seconds + result.solve_seconds,
+                       status=result.status, objective=result.objective,
+                       build_seconds=round(result.build_seconds, 3))
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        pd.DataFrame(rows).to_csv(args.output, index=False)
+        print(f"Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
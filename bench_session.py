@@ -0,0 +1,79 @@
+import argparse
+import copy
+
+import numpy as np
+
+from excel_batches import Batch
+from session import PlanningSession
+from synthetic_data import synthetic_raw_data
+
+
+# Edición típica de un planificador: llegan algunos lotes, se venden otros y
+# cambia la demanda de un cliente.
+def edit_raw_data(raw_data, edits, seed):
+    rng = np.random.default_rng(seed)
+    edited = {"batches": dict(raw_data["batches"]),
+              "requests": dict(raw_data["requests"]),
+              "importance": raw_data["importance"]}
+
+    batch_ids = list(edited["batches"])
+
+    for batch_id in rng.choice(batch_ids, size=edits, replace=False).tolist():
+        del edited["batches"][batch_id]
+
+    for template_id in rng.choice(batch_ids, size=edits, replace=False).tolist():
+        template = raw_data["batches"][template_id]
+        batch_id = f"{template_id}N{seed}"
+        edited["batches"][batch_id] = Batch.from_parsed(
+            center_name=template.center_name,
+            mill=template.mill,
+            shipping_date_epoch=template.shipping_date_epoch,
+            batch_id=batch_id,
+            product_id=template.product_id,
+            mass=template.mass,
+            sellable_clients=template.sellable_clients
+        )
+
+    request_key = rng.choice(list(edited["requests"])).item()
+    request = copy.copy(edited["requests"][request_key])
+    request.requested = request.requested + 500
+    edited["requests"][request_key] = request
+
+    return edited
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tiempo de respuesta de la sesión incremental ante ediciones "
+                    "pequeñas, contra resolver todo desde cero."
+    )
+    parser.add_argument("--batches", type=int, default=5_000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--edits", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=30)
+    args = parser.parse_args()
+
+    raw_data = synthetic_raw_data(args.batches, args.clients, args.products)
+
+    session = PlanningSession(time_limit=args.time_limit)
+    first = session.load(raw_data)
+    print(f"Carga inicial: {first.build_seconds + first.solve_seconds:.2f} s | "
+          f"Objetivo: {first.objective}")
+
+    for round_number in range(args.rounds):
+        raw_data = edit_raw_data(raw_data, args.edits, seed=round_number)
+
+        incremental = session.update(raw_data)
+        from_scratch = PlanningSession(time_limit=args.time_limit).load(raw_data)
+
+        print(f"Ronda {round_number + 1}: "
+              f"incremental {incremental.build_seconds + incremental.solve_seconds:.2f} s "
+              f"(objetivo {incremental.objective}) | "
+              f"desde cero {from_scratch.build_seconds + from_scratch.solve_seconds:.2f} s "
+              f"(objetivo {from_scratch.objective})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import math
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from excel_batches import get_batches_from_stocks
+from bench_excel_batches import synthetic_stocks_dataframe
+
+
+# Escribe la hoja "Format" con el mismo formato que STOCK.xlsx (una fila de
+# títulos antes del encabezado). El modo `write_only` escribe fila a fila.
+def write_synthetic_stocks(path, rows, clients, seed=0):
+    import openpyxl
+
+    dataframe = synthetic_stocks_dataframe(rows, clients, seed)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Format")
+
+    sheet.append([None] * len(dataframe.columns))
+    sheet.append(list(dataframe.columns))
+
+    for row in dataframe.itertuples(index=False):
+        sheet.append([None if isinstance(value, float) and math.isnan(value)
+                      else value.to_pydatetime() if hasattr(value, "to_pydatetime")
+                      else value
+                      for value in row])
+
+    workbook.save(path)
+
+
+# Tiempo (sin tracemalloc, que lo distorsiona) y pico de memoria en otra corrida.
+def measure(function):
+    start = perf_counter()
+    result = function()
+    seconds = perf_counter() - start
+
+    del result
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pico de memoria (tracemalloc) de la carga de STOCK.xlsx con "
+                    "pandas contra la lectura en streaming de openpyxl."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--clients", type=int, default=13)
+    args = parser.parse_args()
+
+    print(f"{'filas':>8} | {'xlsx (MB)':>9} | {'pandas (s)':>10} | {'pandas (MB)':>11} | "
+          f"{'streaming (s)':>13} | {'streaming (MB)':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.sizes:
+            path = os.path.join(tmp_dir, f"STOCK_{rows}.xlsx")
+            write_synthetic_stocks(path, rows, args.clients)
+
+            pandas_batches = get_batches_from_stocks(path)
+            streaming_batches = get_batches_from_stocks(path, streaming=True)
+
+            assert pandas_batches.keys() == streaming_batches.keys()
+            assert all(pandas_batches[key].fields() == streaming_batches[key].fields()
+                       for key in pandas_batches)
+
+            del pandas_batches, streaming_batches
+
+            pandas_seconds, pandas_mb = measure(lambda: get_batches_from_stocks(path))
+            streaming_seconds, streaming_mb = measure(
+                lambda: get_batches_from_stocks(path, streaming=True)
+            )
+
+            print(f"{rows:>8} | {os.path.getsize(path) / 2 ** 20:>9.1f} | "
+                  f"{pandas_seconds:>10.2f} | {pandas_mb:>11.1f} | "
+                  f"{streaming_seconds:>13.2f} | {streaming_mb:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
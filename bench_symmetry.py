@@ -0,0 +1,59 @@
+import argparse
+
+import numpy as np
+
+from synthetic_data import synthetic_raw_data
+from tables import Dataset
+from parameters import ModelParameters
+from model_builder import build_allocation_model
+from model_backends import solve_model
+
+
+# Stock con muchos lotes casi idénticos: pocos productos, pocas fechas nave,
+# una sola planta y pocos clientes, con masas parecidas pero distintas (el
+# presolve no los puede agregar). Compara CBC con y sin filas de simetría.
+def near_identical_raw_data(batches_count, clients_count, products_count, ship_dates,
+                            seed=0):
+    raw_data = synthetic_raw_data(batches_count, clients_count, products_count=products_count,
+                                  locations_count=1, aptitude_rate=0.5, seed=seed,
+                                  mass_range=(200, 260))
+    rng = np.random.default_rng(seed + 1)
+
+    for batch in raw_data["batches"].values():
+        batch.shipping_date_epoch = 1_690_000_000 + 86_400 * int(rng.integers(0, ship_dates))
+
+    return raw_data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mide el efecto de las filas de simetría entre lotes equivalentes."
+    )
+    parser.add_argument("--batches", type=int, nargs="+", default=[200, 400, 800])
+    parser.add_argument("--clients", type=int, default=6)
+    parser.add_argument("--products", type=int, default=2)
+    parser.add_argument("--ship-dates", type=int, default=3)
+    parser.add_argument("--objective", default="count", choices=["count", "fifo"])
+    parser.add_argument("--time-limit", type=float, default=60)
+    args = parser.parse_args()
+
+    for batches_count in args.batches:
+        raw_data = near_identical_raw_data(batches_count, args.clients, args.products,
+                                           args.ship_dates)
+        parameters = ModelParameters(Dataset(raw_data))
+
+        for symmetry_breaking in (False, True):
+            model = build_allocation_model(parameters, sale_excess=15,
+                                           objective=args.objective,
+                                           symmetry_breaking=symmetry_breaking)
+            result = solve_model(model, "cbc", time_limit=args.time_limit)
+
+            print(f"{batches_count:>6} | simetría: {'sí' if symmetry_breaking else 'no':<2} | "
+                  f"filas: {model.constraints_count:>6} | {result.status:<16} | "
+                  f"objetivo: {result.objective:.3f} | gap: "
+                  f"{'-' if result.gap is None else f'{result.gap:.2%}'} | "
+                  f"{result.solve_seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+import numpy as np
+
+from excel_batches import sellable_flags
+
+
+# ## Matriz de aptitud cliente × lote
+# Fila i ↔ clients[i], columna j ↔ batches[j]; True si el lote es apto para el
+# cliente. Reemplaza al diccionario/tabla larga de (client_id, batch_id, apt)
+# cuando se necesita operar sobre la aptitud completa.
+class CompatibilityMatrix:
+    def __init__(self, clients, batches, matrix):
+        self.clients = list(clients)
+        self.batches = list(batches)
+
+        self.client_index = {client: index for index, client in enumerate(self.clients)}
+        self.batch_index = {batch: index for index, batch in enumerate(self.batches)}
+
+        self.matrix = np.asarray(matrix, dtype=bool)
+
+        if self.matrix.shape != (len(self.clients), len(self.batches)):
+            raise ValueError(
+                f"Matriz de aptitud de forma {self.matrix.shape}; se esperaba "
+                f"({len(self.clients)}, {len(self.batches)})"
+            )
+
+    @classmethod
+    def from_batches_data(cls, batches_data, clients, batches):
+        client_index = {client: index for index, client in enumerate(clients)}
+
+        # Lotes agrupados por lista de códigos compartida; cada grupo se
+        # expande desde las máscaras de aptitud de una sola vez.
+        groups = defaultdict(lambda: ([], []))
+
+        for col, batch in enumerate(batches):
+            sellable_clients = batches_data[batch].sellable_clients
+            group_cols, group_masks = groups[sellable_clients.clients]
+            group_cols.append(col)
+            group_masks.append(sellable_clients.mask)
+
+        matrix = np.zeros((len(clients), len(batches)), dtype=bool)
+
+        for client_codes, (group_cols, group_masks) in groups.items():
+            rows = [client_index[client] for client in client_codes.codes]
+            flags = sellable_flags(group_masks, len(client_codes))
+            matrix[np.ix_(rows, group_cols)] |= flags.T
+
+        return cls(clients, batches, matrix)
+
+    def __repr__(self):
+        return (f"CompatibilityMatrix({len(self.clients)} clientes × "
+                f"{len(self.batches)} lotes, {self.nnz} pares aptos)")
+
+    # A_cb[(client, batch)] -> 1 / 0, igual que el diccionario de parámetros.
+    # Los pares desconocidos valen 0.
+    def __getitem__(self, key):
+        client, batch = key
+        row = self.client_index.get(client)
+        col = self.batch_index.get(batch)
+
+        if row is None or col is None:
+            return 0
+
+        return int(self.matrix[row, col])
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @property
+    def nnz(self):
+        return int(np.count_nonzero(self.matrix))
+
+    # Pares (client_id, batch_id) aptos, recorridos lote a lote.
+    def pairs(self):
+        cols, rows = np.nonzero(self.matrix.T)
+
+        return [(self.clients[row], self.batches[col])
+                for row, col in zip(rows.tolist(), cols.tolist())]
+
+    # Exportación dispersa en formato coordenado: (filas, columnas).
+    def to_coo(self):
+        rows, cols = np.nonzero(self.matrix)
+        return rows, cols
+
+    # Exportación dispersa CSR por cliente: (indptr, indices).
+    def to_csr(self):
+        rows, cols = np.nonzero(self.matrix)
+        indptr = np.zeros(len(self.clients) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.clients)), out=indptr[1:])
+
+        return indptr, cols
+
+    # Matriz empaquetada en bits por fila (|B| / 8 bytes por cliente).
+    def to_bitset(self):
+        return np.packbits(self.matrix, axis=1)
@@ -0,0 +1,2 @@
+# Los módulos del proyecto están en la raíz del repositorio; este archivo
+# hace que pytest la agregue a sys.path para que `tests/` pueda importarlos.
@@ -0,0 +1,130 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch
+
+
+# ## Descomposición en componentes conexas
+# Dos columnas (pares cliente-lote) están conectadas si comparten una fila:
+# el mismo lote (unicidad) o el mismo cliente y producto (límite de
+# despacho). Como el objetivo es separable, cada componente conexa es un
+# problema independiente; en la práctica las componentes siguen a los
+# productos, las plantas y las ubicaciones de los clientes.
+
+def _find(parent, node):
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+
+    return node
+
+
+# Etiqueta de componente (0..n-1) de cada columna del modelo.
+def find_components(model):
+    parent = list(range(model.variables_count))
+    indptr = model.indptr.tolist()
+    indices = model.indices.tolist()
+
+    for row in range(model.constraints_count):
+        start, end = indptr[row], indptr[row + 1]
+
+        if end - start < 2:
+            continue
+
+        root = _find(parent, indices[start])
+
+        for entry in range(start + 1, end):
+            other = _find(parent, indices[entry])
+
+            if other != root:
+                parent[other] = root
+
+    roots = np.array([_find(parent, node) for node in range(model.variables_count)],
+                     dtype=np.int64)
+    _, labels = np.unique(roots, return_inverse=True)
+
+    return labels
+
+
+# Reparte las componentes en `blocks` grupos de tamaño parecido (la más grande
+# primero, siempre al grupo más liviano). Cada grupo se resuelve como un único
+# MIP diagonal por bloques, así las componentes pequeñas no pagan cada una el
+# arranque de un proceso del solucionador.
+def group_components(labels, blocks):
+    sizes = np.bincount(labels)
+    loads = [0] * blocks
+    members = [[] for _ in range(blocks)]
+
+    for component in np.argsort(-sizes, kind="stable").tolist():
+        lightest = loads.index(min(loads))
+        loads[lightest] += int(sizes[component])
+        members[lightest].append(component)
+
+    block_of_component = np.empty(len(sizes), dtype=np.int64)
+
+    for block, components in enumerate(members):
+        block_of_component[components] = block
+
+    block_of_column = block_of_component[labels]
+
+    return [np.flatnonzero(block_of_column == block)
+            for block in range(blocks) if members[block]]
+
+
+# ------------------------------------------------------------
+
+def _solve_block(args):
+    from model_backends import solve_model
+
+    submodel, backend, options = args
+    return solve_model(submodel, backend, **options)
+
+
+def solve_decomposed(model, backend="cbc", max_workers=None, blocks_per_worker=4,
+                     **options):
+    stopwatch = Stopwatch()
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    labels = find_components(model)
+    components_count = int(labels.max()) + 1 if len(labels) else 0
+
+    blocks = group_components(labels, min(components_count,
+                                          max_workers * blocks_per_worker)) \
+        if components_count else []
+    submodels = [model.restrict(columns) for columns in blocks]
+
+    build_seconds = stopwatch.lap()
+
+    tasks = [(submodel, backend, options) for submodel in submodels]
+
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_solve_block, tasks))
+    else:
+        results = [_solve_block(task) for task in tasks]
+
+    values = np.zeros(model.variables_count)
+
+    for columns, result in zip(blocks, results):
+        values[columns] = result.values
+
+    bounds = [result.bound for result in results]
+    bound = None if None in bounds else float(sum(bounds))
+
+    statuses = {result.status for result in results}
+    status = statuses.pop() if len(statuses) == 1 else ", ".join(sorted(statuses))
+
+    print(f"[{backend}] Componentes: {components_count} | Bloques: {len(blocks)} | "
+          f"Procesos: {min(max_workers, max(len(blocks), 1))}")
+
+    return SolveResult(backend=f"{backend}/componentes",
+                       status=status or "Optimal",
+                       objective=float(model.objective @ values),
+                       values=values,
+                       build_seconds=build_seconds,
+                       solve_seconds=stopwatch.lap(),
+                       bound=bound)
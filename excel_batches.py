@@ -1,8 +1,122 @@
+import math
+from collections.abc import Mapping
+from datetime import datetime
+from numbers import Number
+
+import numpy as np
 import pandas as pd
-from collections import defaultdict
 
 
+# ## Aptitud compacta de un lote
+# Todos los lotes de una misma hoja comparten la lista de códigos de cliente
+# (`ClientCodes`, una sola instancia por lista); cada lote solo guarda un
+# entero cuyo bit i indica si es apto para el cliente codes[i]. Se lee como un
+# diccionario {código de cliente: apto}; los clientes desconocidos valen False.
+class ClientCodes:
+    __slots__ = ("codes", "positions")
+
+    _shared = {}
+
+    def __init__(self, codes):
+        self.codes = tuple(codes)
+        self.positions = {code: position for position, code in enumerate(self.codes)}
+
+    # Instancia compartida para la lista `codes`.
+    @classmethod
+    def shared(cls, codes):
+        codes = tuple(codes)
+        instance = cls._shared.get(codes)
+
+        if instance is None:
+            instance = cls._shared[codes] = cls(codes)
+
+        return instance
+
+    def __reduce__(self):
+        return ClientCodes.shared, (self.codes, )
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class SellableClients(Mapping):
+    __slots__ = ("clients", "mask")
+
+    def __init__(self, clients, mask=0):
+        self.clients = clients
+        self.mask = mask
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        codes = []
+        mask = 0
+
+        for position, (code, sellable) in enumerate(pairs):
+            codes.append(code)
+
+            if sellable:
+                mask |= 1 << position
+
+        return cls(ClientCodes.shared(codes), mask)
+
+    def __getitem__(self, code):
+        position = self.clients.positions.get(code)
+        return position is not None and bool(self.mask >> position & 1)
+
+    def __contains__(self, code):
+        return code in self.clients.positions
+
+    def __iter__(self):
+        return iter(self.clients.codes)
+
+    def __len__(self):
+        return len(self.clients.codes)
+
+    def keys(self):
+        return self.clients.codes
+
+    def flags(self):
+        mask = self.mask
+        return [bool(mask >> position & 1) for position in range(len(self.clients))]
+
+    def items(self):
+        return list(zip(self.clients.codes, self.flags()))
+
+    def __eq__(self, other):
+        if isinstance(other, SellableClients) and other.clients is self.clients:
+            return other.mask == self.mask
+
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"SellableClients({dict(self.items())})"
+
+
+# Aptitud de varios lotes con los mismos códigos: matriz booleana (lotes ×
+# clientes) <-> lista de máscaras enteras.
+def sellable_masks(sellable: np.ndarray) -> list:
+    packed = np.packbits(np.asarray(sellable, dtype=bool), axis=1, bitorder="little")
+    width = packed.shape[1]
+    raw = packed.tobytes()
+
+    return [int.from_bytes(raw[start:start + width], "little")
+            for start in range(0, len(raw), width)] if width else [0] * len(packed)
+
+
+def sellable_flags(masks, clients_count: int) -> np.ndarray:
+    width = (clients_count + 7) // 8
+    raw = b"".join(mask.to_bytes(width, "little") for mask in masks)
+    packed = np.frombuffer(raw, dtype=np.uint8).reshape(len(masks), width)
+
+    return np.unpackbits(packed, axis=1, bitorder="little")[:, :clients_count].astype(bool)
+
+
+# ------------------------------------------------------------
+
 class Batch:
+    __slots__ = ("center_name", "mill", "shipping_date_epoch", "batch_id",
+                 "product_id", "mass", "sellable_clients")
+
     def __init__(self,
                  center_name, mill,
                  shipping_date,
@@ -19,10 +133,40 @@ class Batch:
 
         self.mass = float(arrived_mass + mass_in_transit)
 
-        self.sellable_clients = defaultdict(bool)
+        self.sellable_clients = SellableClients.from_pairs(sellable_clients.items())
+
+    # Construye un lote a partir de valores ya normalizados (ver
+    # `batches_from_dataframe_columnar`), sin volver a parsear cada celda.
+    # `sellable_clients` puede ser un `SellableClients` (se comparte tal cual),
+    # un diccionario o pares (código, apto).
+    @classmethod
+    def from_parsed(cls,
+                    center_name, mill,
+                    shipping_date_epoch,
+                    batch_id, product_id,
+                    mass,
+                    sellable_clients):
+        batch = cls.__new__(cls)
+        batch.center_name = center_name
+        batch.mill = mill
+        batch.shipping_date_epoch = shipping_date_epoch
+        batch.batch_id = batch_id
+        batch.product_id = product_id
+        batch.mass = mass
 
-        for client_number_code, sellable in sellable_clients.items():
-            self.sellable_clients[client_number_code] = sellable
+        if not isinstance(sellable_clients, SellableClients):
+            if isinstance(sellable_clients, Mapping):
+                sellable_clients = sellable_clients.items()
+
+            sellable_clients = SellableClients.from_pairs(sellable_clients)
+
+        batch.sellable_clients = sellable_clients
+
+        return batch
+
+    # Valores de todos los campos (para comparar lotes).
+    def fields(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
 
     def __str__(self):
         return f"""
@@ -36,23 +180,28 @@ Clientes aptos para venta: {self.sellable_clients}
         """
 
 
-def get_batches_from_stocks(
+def read_stocks_dataframe(
     stocks_path: str = "./STOCK.xlsx",
     stocks_sheet: str = "Format",
     skip_rows: int = 1,
-) -> dict:
-    path = stocks_path
-    sheet = stocks_sheet
-    df = pd.read_excel(path, sheet_name=sheet, skiprows=skip_rows)
-    dataframe = df.dropna(subset=["Lote"])
+) -> pd.DataFrame:
+    df = pd.read_excel(stocks_path, sheet_name=stocks_sheet, skiprows=skip_rows)
+    return df.dropna(subset=["Lote"])
 
-    clients_number_code = [
+
+def get_clients_number_code(dataframe: pd.DataFrame) -> list:
+    return [
         col
         for col in dataframe.columns
         if str(col).isdigit()
         and str(col).isdigit() != "0"
     ]
 
+
+# Construcción fila a fila (celda por celda).
+def batches_from_dataframe(dataframe: pd.DataFrame) -> dict:
+    clients_number_code = get_clients_number_code(dataframe)
+
     batches = {
         str(dataframe["Lote"][row]): Batch(
             center_name=dataframe["Nombre Centro"][row],
@@ -77,6 +226,172 @@ def get_batches_from_stocks(
     return batches
 
 
+# Una celda de cliente marca al lote como apto si su texto contiene algún
+# dígito. En columnas numéricas eso equivale a tener un valor finito.
+def _sellable_column(column: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(column):
+        return np.isfinite(column.to_numpy(dtype=float))
+
+    return column.astype(str).str.contains(r"\d", regex=True).to_numpy(dtype=bool)
+
+
+# Construcción por columnas: fechas, masas, IDs y la matriz de aptitud se
+# calculan con operaciones de pandas/NumPy sobre la columna completa.
+def batches_from_dataframe_columnar(dataframe: pd.DataFrame) -> dict:
+    clients_number_code = get_clients_number_code(dataframe)
+    client_codes = ClientCodes.shared(int(code) for code in clients_number_code)
+
+    keys = dataframe["Lote"].astype(str).tolist()
+    batch_ids = dataframe["Lote"].astype(str).str.upper().tolist()
+    product_ids = dataframe["Material"].astype(str).str.upper().tolist()
+    center_names = dataframe["Nombre Centro"].astype(str).str.title().tolist()
+    mills = dataframe["Planta"].astype(str).str.title().tolist()
+
+    shipping_dates = pd.to_datetime(dataframe["Fecha Nave"])
+    shipping_dates_epoch = (
+        (shipping_dates - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    ).astype("int64").tolist()
+
+    masses = (
+        dataframe["Net Arrib (LU)"].to_numpy(dtype=float)
+        + dataframe["Net en Tráns"].to_numpy(dtype=float)
+    ).tolist()
+
+    if clients_number_code:
+        masks = sellable_masks(np.column_stack([
+            _sellable_column(dataframe[code]) for code in clients_number_code
+        ]))
+    else:
+        masks = [0] * len(keys)
+
+    return {
+        key: Batch.from_parsed(
+            center_name=center_name,
+            mill=mill,
+            shipping_date_epoch=shipping_date_epoch,
+            batch_id=batch_id,
+            product_id=product_id,
+            mass=mass,
+            sellable_clients=SellableClients(client_codes, mask)
+        )
+        for (key, center_name, mill, shipping_date_epoch,
+             batch_id, product_id, mass, mask)
+        in zip(keys, center_names, mills, shipping_dates_epoch,
+               batch_ids, product_ids, masses, masks)
+    }
+
+
+# ------------------------------------------------------------
+
+EPOCH = datetime(1970, 1, 1)
+
+
+# Mismas reglas que la carga por columnas, celda por celda: una celda de
+# cliente con un número es apta si es finito y con texto si contiene dígitos.
+def _sellable_cell(value) -> bool:
+    if value is None:
+        return False
+
+    if isinstance(value, Number):
+        return math.isfinite(value)
+
+    return any(character.isdigit() for character in str(value))
+
+
+def _epoch_seconds(value) -> int:
+    if isinstance(value, datetime):
+        return (value - EPOCH) // pd.Timedelta(seconds=1)
+
+    return int(pd.Timestamp(value).value // 10 ** 9)
+
+
+# pandas lee las celdas vacías o con texto vacío como NaN.
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _float_cell(value) -> float:
+    return math.nan if _is_missing(value) else float(value)
+
+
+# Lectura en streaming (openpyxl en modo de solo lectura): las filas se leen
+# de a una, las que no tienen Lote se descartan y el resto se convierte en
+# `Batch` al llegar, sin armar nunca la hoja completa en memoria. El pico de
+# memoria queda acotado por los lotes resultantes, no por el tamaño de la hoja.
+def iter_batches_from_stocks(
+    stocks_path: str = "./STOCK.xlsx",
+    stocks_sheet: str = "Format",
+    skip_rows: int = 1,
+):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(stocks_path, read_only=True, data_only=True,
+                                      keep_links=False)
+
+    try:
+        rows = workbook[stocks_sheet].iter_rows(min_row=skip_rows + 1, values_only=True)
+        header = next(rows, ())
+        columns = {name: position for position, name in enumerate(header)
+                   if name is not None}
+
+        center_col = columns["Nombre Centro"]
+        mill_col = columns["Planta"]
+        date_col = columns["Fecha Nave"]
+        batch_col = columns["Lote"]
+        product_col = columns["Material"]
+        arrived_col = columns["Net Arrib (LU)"]
+        transit_col = columns["Net en Tráns"]
+
+        client_columns = [(int(name), position) for name, position in columns.items()
+                          if str(name).isdigit()]
+        client_codes = ClientCodes.shared(code for code, _ in client_columns)
+        client_positions = [position for _, position in client_columns]
+
+        for row in rows:
+            if batch_col >= len(row) or _is_missing(row[batch_col]):
+                continue
+
+            row = row + (None, ) * (len(header) - len(row))
+            key = str(row[batch_col])
+
+            mask = 0
+
+            for bit, position in enumerate(client_positions):
+                if _sellable_cell(row[position]):
+                    mask |= 1 << bit
+
+            yield key, Batch.from_parsed(
+                center_name=str(row[center_col]).title(),
+                mill=str(row[mill_col]).title(),
+                shipping_date_epoch=_epoch_seconds(row[date_col]),
+                batch_id=key.upper(),
+                product_id=str(row[product_col]).upper(),
+                mass=_float_cell(row[arrived_col]) + _float_cell(row[transit_col]),
+                sellable_clients=SellableClients(client_codes, mask)
+            )
+
+    finally:
+        workbook.close()
+
+
+def get_batches_from_stocks(
+    stocks_path: str = "./STOCK.xlsx",
+    stocks_sheet: str = "Format",
+    skip_rows: int = 1,
+    vectorized: bool = True,
+    streaming: bool = False,
+) -> dict:
+    if streaming:
+        return dict(iter_batches_from_stocks(stocks_path, stocks_sheet, skip_rows))
+
+    dataframe = read_stocks_dataframe(stocks_path, stocks_sheet, skip_rows)
+
+    if vectorized:
+        return batches_from_dataframe_columnar(dataframe)
+
+    return batches_from_dataframe(dataframe)
+
+
 if __name__ == "__main__":
     data = get_batches_from_stocks()
     print(data)
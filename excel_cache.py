@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from excel_batches import (Batch, ClientCodes, SellableClients, get_batches_from_stocks,
+                           sellable_flags, sellable_masks)
+from excel_requests import Request, get_sales_data
+from excel_priority import Priority, get_client_priority_data
+
+
+# Caché en disco de los libros ya parseados. Cada entrada es un .npz (columnas
+# NumPy, sin pickle) identificado por el hash del contenido del archivo y los
+# argumentos del cargador. Si el archivo cambia, cambia su hash y la entrada
+# anterior deja de usarse hasta que la política de tamaño la elimina.
+# `CACHE_VERSION` también forma parte de la clave: hay que subirlo cada vez
+# que cambia un cargador, los campos de `Batch`/`Request`/`Priority` o su
+# codificación, para no decodificar entradas viejas.
+CACHE_VERSION = 1
+CACHE_DIR = "./.cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+INDEX_FILE = "index.json"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+# ------------------------------------------------------------
+
+def _read_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE), encoding="utf-8") as file:
+            return json.load(file)
+
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(cache_dir, index):
+    _atomic_write(os.path.join(cache_dir, INDEX_FILE),
+                  lambda file: file.write(json.dumps(index).encode("utf-8")))
+
+
+def _atomic_write(path, write):
+    directory = os.path.dirname(path)
+    descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            write(file)
+
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Hash del contenido del archivo. Se reutiliza el hash guardado mientras la
+# ruta, el tamaño y la fecha de modificación no cambien. El índice se vuelve a
+# leer justo antes de escribirlo para no perder las entradas que otro proceso
+# agregó mientras se calculaba el hash; aun así, los procesos que comparten el
+# caché deben calcular las huellas antes de repartirse el trabajo (ver
+# `fingerprint_files`).
+def file_fingerprint(file_path, cache_dir=CACHE_DIR):
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+
+    index = _read_index(cache_dir)
+    entry = index.get(path)
+
+    if (entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns):
+        return entry["sha256"]
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+
+    entry = {"size": stat.st_size,
+             "mtime_ns": stat.st_mtime_ns,
+             "sha256": digest.hexdigest()}
+
+    index = _read_index(cache_dir)
+    index[path] = entry
+    _write_index(cache_dir, index)
+
+    return entry["sha256"]
+
+
+# Calcula y guarda las huellas de varios archivos; después, otros procesos
+# pueden leerlos del caché sin escribir el índice.
+def fingerprint_files(file_paths, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+
+    return [file_fingerprint(file_path, cache_dir) for file_path in file_paths]
+
+
+def _entry_path(cache_dir, kind, file_path, loader_kwargs):
+    key = json.dumps({"version": CACHE_VERSION,
+                      "kind": kind,
+                      "path": os.path.abspath(file_path),
+                      "sha256": file_fingerprint(file_path, cache_dir),
+                      "kwargs": loader_kwargs},
+                     sort_keys=True)
+
+    return os.path.join(cache_dir,
+                        f"{kind}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.npz")
+
+
+# Elimina las entradas usadas hace más tiempo hasta quedar bajo `max_bytes` y
+# devuelve los nombres de las que eliminó. Otro proceso puede haber eliminado
+# la misma entrada entre medio; esa no cuenta como eliminada aquí.
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    entries = []
+
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".npz"):
+            continue
+
+        try:
+            stat = os.stat(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            continue
+
+        entries.append((stat.st_mtime_ns, stat.st_size, name))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    removed = []
+
+    for _, size, name in entries:
+        if total <= max_bytes:
+            break
+
+        try:
+            os.remove(os.path.join(cache_dir, name))
+            removed.append(name)
+        except FileNotFoundError:
+            pass
+
+        total -= size
+
+    return removed
+
+
+# ------------------------------------------------------------
+
+def _strings(values):
+    return np.array(list(values), dtype=str)
+
+
+# Matriz lotes × clientes; los lotes que comparten los códigos del primero
+# (todos, al venir de una misma hoja) se convierten desde su máscara.
+def _encode_sellable(entries, client_codes):
+    if all(batch.sellable_clients.clients is client_codes for batch in entries):
+        return sellable_flags([batch.sellable_clients.mask for batch in entries],
+                              len(client_codes))
+
+    return np.array([[batch.sellable_clients[code] for code in client_codes.codes]
+                     for batch in entries],
+                    dtype=bool).reshape(len(entries), len(client_codes))
+
+
+def _encode_batches(batches):
+    entries = list(batches.values())
+    client_codes = entries[0].sellable_clients.clients if entries else ClientCodes.shared(())
+
+    return {
+        "keys": _strings(batches.keys()),
+        "center_name": _strings(batch.center_name for batch in entries),
+        "mill": _strings(batch.mill for batch in entries),
+        "shipping_date_epoch": np.array([batch.shipping_date_epoch for batch in entries],
+                                        dtype=np.int64),
+        "batch_id": _strings(batch.batch_id for batch in entries),
+        "product_id": _strings(batch.product_id for batch in entries),
+        "mass": np.array([batch.mass for batch in entries], dtype=float),
+        "client_codes": np.array(client_codes.codes, dtype=np.int64),
+        "sellable": _encode_sellable(entries, client_codes),
+    }
+
+
+def _decode_batches(arrays):
+    client_codes = ClientCodes.shared(arrays["client_codes"].tolist())
+
+    return {
+        key: Batch.from_parsed(
+            center_name=center_name,
+            mill=mill,
+            shipping_date_epoch=shipping_date_epoch,
+            batch_id=batch_id,
+            product_id=product_id,
+            mass=mass,
+            sellable_clients=SellableClients(client_codes, mask)
+        )
+        for (key, center_name, mill, shipping_date_epoch,
+             batch_id, product_id, mass, mask)
+        in zip(arrays["keys"].tolist(),
+               arrays["center_name"].tolist(),
+               arrays["mill"].tolist(),
+               arrays["shipping_date_epoch"].tolist(),
+               arrays["batch_id"].tolist(),
+               arrays["product_id"].tolist(),
+               arrays["mass"].tolist(),
+               sellable_masks(arrays["sellable"]))
+    }
+
+
+def _encode_requests(requests):
+    entries = list(requests.values())
+
+    return {
+        "keys": np.array(list(requests.keys()), dtype=np.int64),
+        "client_description": _strings(request.client_description for request in entries),
+        "client_id": np.array([request.client_id for request in entries], dtype=np.int64),
+        "client_group_description": _strings(request.client_group_description
+                                             for request in entries),
+        "location": _strings(request.location for request in entries),
+        "product_id": _strings(request.product_id for request in entries),
+        "requested": np.array([request.requested for request in entries], dtype=float),
+    }
+
+
+def _decode_requests(arrays):
+    return {
+        key: Request(
+            client_description=client_description,
+            client_id=client_id,
+            client_group_description=client_group_description,
+            location=location,
+            product_id=product_id,
+            requested=requested
+        )
+        for (key, client_description, client_id, client_group_description,
+             location, product_id, requested)
+        in zip(arrays["keys"].tolist(),
+               arrays["client_description"].tolist(),
+               arrays["client_id"].tolist(),
+               arrays["client_group_description"].tolist(),
+               arrays["location"].tolist(),
+               arrays["product_id"].tolist(),
+               arrays["requested"].tolist())
+    }
+
+
+def _encode_priorities(priorities):
+    entries = list(priorities.values())
+
+    return {
+        "keys": np.array(list(priorities.keys()), dtype=np.int64),
+        "client_id": np.array([priority.client_id for priority in entries], dtype=np.int64),
+        "importance": np.array([priority.importance for priority in entries], dtype=float),
+    }
+
+
+def _decode_priorities(arrays):
+    return {
+        key: Priority(client_id=client_id, priority=importance)
+        for key, client_id, importance
+        in zip(arrays["keys"].tolist(),
+               arrays["client_id"].tolist(),
+               arrays["importance"].tolist())
+    }
+
+
+# ------------------------------------------------------------
+
+# Con `evict_entries=False` no se aplica la política de tamaño; así lo hace
+# `tables.get_raw_data(parallel=True)` en sus procesos, y llama a `evict` una
+# sola vez al final.
+def cached_load(kind, file_path, loader, encode, decode,
+                cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, evict_entries=True,
+                **loader_kwargs):
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_path = _entry_path(cache_dir, kind, file_path, loader_kwargs)
+
+    try:
+        with np.load(entry_path, allow_pickle=False) as arrays:
+            data = decode(arrays)
+
+        os.utime(entry_path)
+        return data
+
+    # Entrada inexistente, truncada o con otro formato: se vuelve a leer el libro.
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+
+    data = loader(file_path, **loader_kwargs)
+
+    _atomic_write(entry_path, lambda file: np.savez(file, **encode(data)))
+
+    if evict_entries:
+        evict(cache_dir, max_bytes)
+
+    return data
+
+
+# Codificación a arreglos y decodificación de cada tipo de dato, con las
+# claves de `tables.get_raw_data()`.
+CODECS = {
+    "batches": (_encode_batches, _decode_batches),
+    "requests": (_encode_requests, _decode_requests),
+    "importance": (_encode_priorities, _decode_priorities),
+}
+
+
+def get_cached_batches_from_stocks(stocks_path: str = "./STOCK.xlsx", **kwargs) -> dict:
+    return cached_load("batches", stocks_path, get_batches_from_stocks,
+                       _encode_batches, _decode_batches, **kwargs)
+
+
+def get_cached_sales_data(file_path: str = "./VENTAS.xlsx", **kwargs) -> dict:
+    return cached_load("requests", file_path, get_sales_data,
+                       _encode_requests, _decode_requests, **kwargs)
+
+
+def get_cached_client_priority_data(file_path: str = "./PRIORIDADES.xlsx", **kwargs) -> dict:
+    return cached_load("priorities", file_path, get_client_priority_data,
+                       _encode_priorities, _decode_priorities, **kwargs)
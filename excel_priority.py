@@ -3,6 +3,7 @@ from collections import defaultdict
 
 
 class Priority:
+    __slots__ = ("client_id", "importance")
 
     def __init__(self,
                  client_id: int or str,
@@ -1,8 +1,14 @@
+import re
+
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 
 
 class Request:
+    __slots__ = ("client_description", "client_id", "client_group_description",
+                 "location", "product_id", "requested")
+
     def __init__(self,
                  client_description: str,
                  client_id: str or int,
@@ -53,6 +59,73 @@ def get_sales_data(
     return sales
 
 
+# ------------------------------------------------------------
+
+# Columnas de mes de VENTAS.xlsx ("DEC 2023", "JAN 2024", ...).
+MONTH_COLUMN = re.compile(r"^[A-Z]{3} \d{4}$")
+
+
+# Demanda de todos los meses como un arreglo denso
+# demand[cliente, producto, mes], alineado con `clients`, `products` y
+# `months` (en el orden de las columnas del libro).
+class DemandHorizon:
+    __slots__ = ("clients", "products", "months", "demand")
+
+    def __init__(self, clients, products, months, demand):
+        self.clients = clients
+        self.products = products
+        self.months = months
+        self.demand = demand
+
+    # Demanda [cliente, producto] de un mes.
+    def month(self, month):
+        return self.demand[:, :, self.months.index(month)]
+
+    def __repr__(self):
+        return (f"DemandHorizon({len(self.clients)} clientes, {len(self.products)} "
+                f"productos, {self.months[0]} .. {self.months[-1]})"
+                if self.months else "DemandHorizon()")
+
+
+# Lee todas las columnas de mes (o solo `months`). Igual que en
+# `get_sales_data`, las celdas vacías no aportan demanda y los valores menores
+# que 1 cuentan como 0; si un par (cliente, producto) aparece en más de una
+# fila, vale la última con dato en cada mes. Las filas sin cliente o sin
+# producto (vacías o de totales) se descartan.
+def get_demand_horizon(
+    file_path: str = "./VENTAS.xlsx",
+    file_sheet: str = "Ventas",
+    months: list = None,
+    skip_rows: int = 0
+) -> DemandHorizon:
+
+    df = pd.read_excel(file_path, sheet_name=file_sheet, skiprows=skip_rows)
+    df = df.dropna(subset=["ID de cliente CMPC", "ID de producto"])
+
+    if months is None:
+        months = [column for column in df.columns if MONTH_COLUMN.match(str(column))]
+
+    client_ids = df["ID de cliente CMPC"].astype(int)
+    product_ids = df["ID de producto"].astype(str).str.upper()
+
+    clients = sorted(set(client_ids))
+    products = sorted(set(product_ids))
+
+    rows = pd.Index(clients).get_indexer(client_ids)
+    columns = pd.Index(products).get_indexer(product_ids)
+
+    demand = np.zeros((len(clients), len(products), len(months)), dtype=float)
+
+    for month_position, month in enumerate(months):
+        values = df[month].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+
+        demand[rows[present], columns[present], month_position] = \
+            np.where(values[present] < 1, 0.0, values[present])
+
+    return DemandHorizon(clients, products, list(months), demand)
+
+
 if __name__ == "__main__":
     data = get_sales_data()
     print(data)
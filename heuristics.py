@@ -0,0 +1,75 @@
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch, ROW_SYMMETRY
+
+
+# Filas y coeficientes de cada columna (formato CSC) como listas de Python,
+# para recorrer columnas una a una sin pagar el costo de NumPy por elemento.
+def column_rows(model):
+    row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+    order = np.argsort(model.indices, kind="stable")
+
+    col_indptr = np.zeros(model.variables_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(model.indices, minlength=model.variables_count),
+              out=col_indptr[1:])
+
+    return (col_indptr.tolist(),
+            row_of_entry[order].tolist(),
+            model.data[order].tolist())
+
+
+# ## Asignación FIFO golosa
+# Recorre los pares del lote más antiguo al más nuevo (Fecha Nave) y, para
+# cada lote, del cliente de mayor prioridad al de menor. Entre los lotes que
+# aparecen en filas de simetría va primero el más liviano (el orden de esas
+# filas). Cada par toma tantas unidades como permitan su cota y la holgura de
+# todas sus filas, así que la solución siempre es factible. Devuelve los
+# valores alineados con las columnas del modelo.
+def greedy_fifo_allocation(model):
+    row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+    in_symmetry = np.zeros(model.variables_count, dtype=bool)
+    in_symmetry[model.indices[model.row_kind[row_of_entry] == ROW_SYMMETRY]] = True
+
+    lighter_first = np.where(in_symmetry, model.batch_volume[model.pair_batch], 0.0)
+
+    column_order = np.lexsort((lighter_first,
+                               -model.client_priority[model.pair_client],
+                               model.batch_ship_date[model.pair_batch]))
+
+    col_indptr, col_rows, col_coefficients = column_rows(model)
+    slack = model.rhs.tolist()
+    upper = model.upper.tolist()
+    values = [0.0] * model.variables_count
+
+    for col in column_order.tolist():
+        units = upper[col]
+
+        for entry in range(col_indptr[col], col_indptr[col + 1]):
+            coefficient = col_coefficients[entry]
+
+            if coefficient > 0:
+                units = min(units, (slack[col_rows[entry]] + 1e-9) // coefficient)
+
+        if units < 1:
+            continue
+
+        values[col] = units
+
+        for entry in range(col_indptr[col], col_indptr[col + 1]):
+            slack[col_rows[entry]] -= units * col_coefficients[entry]
+
+    return np.array(values)
+
+
+# Backend "greedy": respuesta rápida sin solucionador MIP.
+def solve_with_greedy(model, **_):
+    stopwatch = Stopwatch()
+
+    values = greedy_fifo_allocation(model)
+
+    return SolveResult(backend="greedy",
+                       status="Feasible",
+                       objective=float(model.objective @ values),
+                       values=values,
+                       build_seconds=0.0,
+                       solve_seconds=stopwatch.lap())
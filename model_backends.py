@@ -0,0 +1,332 @@
+import os
+import shutil
+import tempfile
+from contextlib import nullcontext
+
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch, print_model_size
+from mps_writer import solve_with_cbc, read_cbc_bound
+from heuristics import greedy_fifo_allocation, solve_with_greedy
+from assignment_engine import solve_with_assignment_engine
+from portfolio import solve_with_portfolio
+
+
+# Cada backend recibe un `AllocationModel`, lo traduce a la API de su
+# solucionador, lo resuelve y devuelve un `SolveResult` cuyos `values` están
+# alineados con las variables del modelo (X_k). Las bibliotecas de cada
+# backend se importan solo al usarlo.
+
+
+# -------------===================== PuLP =====================------------ #
+
+def build_pulp_problem(model):
+    import pulp
+
+    problem = pulp.LpProblem("Optimizacion_de_Distribucion", pulp.LpMaximize)
+
+    # Indica si el lote b ∈ B está asignado al cliente c ∈ C.
+    variables = [
+        pulp.LpVariable(f"X_{k}", lowBound=0, upBound=upper, cat=pulp.LpInteger)
+        for k, upper in enumerate(model.upper.tolist())
+    ]
+
+    for row in range(model.constraints_count):
+        indices, data = model.row(row)
+        problem += (
+            pulp.LpAffineExpression(zip((variables[k] for k in indices.tolist()),
+                                        data.tolist())) <= model.rhs[row].item(),
+            f"R_{row}"
+        )
+
+    problem += pulp.LpAffineExpression(zip(variables, model.objective.tolist()))
+
+    return problem, variables
+
+
+def solve_with_pulp(model, time_limit=5, msg=False, solver=None, initial_values=None):
+    import pulp
+
+    stopwatch = Stopwatch()
+
+    problem, variables = build_pulp_problem(model)
+
+    # Solución inicial (MIP start) para CBC.
+    if initial_values is not None:
+        for variable, value in zip(variables, initial_values.tolist()):
+            variable.setInitialValue(value)
+
+    build_seconds = stopwatch.lap()
+
+    # Con el CBC incluido, el log se guarda para leer la cota (gap).
+    log_path = None
+
+    if solver is None:
+        log_dir = tempfile.mkdtemp()
+        log_path = os.path.join(log_dir, "cbc.log")
+        solver = pulp.PULP_CBC_CMD(timeLimit=time_limit, msg=False,
+                                   warmStart=initial_values is not None,
+                                   logPath=log_path)
+
+    problem.solve(solver)
+
+    solve_seconds = stopwatch.lap()
+
+    values = np.array([variable.varValue or 0.0 for variable in variables])
+    bound = None
+
+    # PuLP informa "Optimal" también cuando CBC se detiene por tiempo con una
+    # solución entera; `sol_status` distingue ese caso.
+    status = pulp.LpStatus[problem.status]
+
+    if problem.sol_status == pulp.LpSolutionIntegerFeasible:
+        status = "Feasible"
+
+    if log_path is not None:
+        with open(log_path, encoding="ascii", errors="replace") as file:
+            log_text = file.read()
+
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+        if msg:
+            print(log_text)
+
+        bound = read_cbc_bound(log_text, negated=False)
+
+    return SolveResult(backend="pulp",
+                       status=status,
+                       objective=pulp.value(problem.objective),
+                       values=values,
+                       build_seconds=build_seconds,
+                       solve_seconds=solve_seconds,
+                       bound=bound)
+
+
+# -------------===================== Pyomo ====================------------ #
+
+# `executable` es la ruta al binario del solucionador; por defecto se toma de
+# la variable de entorno GLPSOL_PATH (para GLPK) o se busca en el PATH.
+def solve_with_pyomo(model, time_limit=5, solver_name="glpk", executable=None,
+                     tee=False, initial_values=None):
+    import pyomo.environ as pyomo
+
+    if executable is None and solver_name == "glpk":
+        executable = os.environ.get("GLPSOL_PATH")
+
+    stopwatch = Stopwatch()
+
+    problem = pyomo.ConcreteModel()
+    problem.Variables = pyomo.RangeSet(0, model.variables_count - 1)
+    problem.Rows = pyomo.RangeSet(0, model.constraints_count - 1)
+
+    upper = model.upper.tolist()
+    problem.X = pyomo.Var(problem.Variables, domain=pyomo.NonNegativeIntegers,
+                          bounds=lambda _, k: (0, upper[k]))
+
+    if initial_values is not None:
+        for k, value in enumerate(initial_values.tolist()):
+            problem.X[k].value = value
+
+    def row_rule(problem, row):
+        indices, data = model.row(row)
+        return (
+            sum(coefficient * problem.X[k]
+                for k, coefficient in zip(indices.tolist(), data.tolist()))
+            <= model.rhs[row].item()
+        )
+
+    problem.constraints = pyomo.Constraint(problem.Rows, rule=row_rule)
+
+    objective = model.objective.tolist()
+    problem.objective = pyomo.Objective(
+        expr=sum(objective[k] * problem.X[k] for k in problem.Variables),
+        sense=pyomo.maximize
+    )
+
+    build_seconds = stopwatch.lap()
+
+    if executable is None:
+        solver = pyomo.SolverFactory(solver_name)
+    else:
+        solver = pyomo.SolverFactory(solver_name, executable=executable)
+
+    if time_limit is not None and solver_name == "glpk":
+        solver.options["tmlim"] = time_limit
+    elif time_limit is not None and solver_name == "cbc":
+        solver.options["sec"] = time_limit
+
+    # GLPK no acepta soluciones iniciales; el resto de los solucionadores que
+    # lo permiten reciben los valores cargados en X.
+    warm_start = initial_values is not None and solver.warm_start_capable()
+
+    if warm_start:
+        results = solver.solve(problem, tee=tee, warmstart=True)
+    else:
+        results = solver.solve(problem, tee=tee)
+
+    solve_seconds = stopwatch.lap()
+
+    values = np.array([problem.X[k].value or 0.0 for k in problem.Variables])
+
+    return SolveResult(backend="pyomo",
+                       status=str(results.solver.termination_condition),
+                       objective=pyomo.value(problem.objective),
+                       values=values,
+                       build_seconds=build_seconds,
+                       solve_seconds=solve_seconds)
+
+
+# -------------===================== GEKKO ====================------------ #
+
+def solve_with_gekko(model, time_limit=5, disp=False, initial_values=None):
+    from gekko import GEKKO
+
+    stopwatch = Stopwatch()
+
+    problem = GEKKO(remote=False)
+
+    # APOPT (SOLVER = 1) es el solucionador de GEKKO que respeta `integer`.
+    problem.options.SOLVER = 1
+    if time_limit is not None:
+        problem.options.MAX_TIME = time_limit
+
+    if initial_values is None:
+        initial_values = np.zeros(model.variables_count)
+
+    # El valor inicial de cada variable es el punto de partida de APOPT.
+    variables = [problem.Var(value=value, lb=0, ub=upper, integer=True)
+                 for value, upper in zip(initial_values.tolist(), model.upper.tolist())]
+
+    for row in range(model.constraints_count):
+        indices, data = model.row(row)
+        problem.Equation(
+            problem.sum([coefficient * variables[k]
+                         for k, coefficient in zip(indices.tolist(), data.tolist())])
+            <= model.rhs[row].item()
+        )
+
+    problem.Maximize(
+        problem.sum([coefficient * variable
+                     for coefficient, variable in zip(model.objective.tolist(), variables)])
+    )
+
+    build_seconds = stopwatch.lap()
+
+    try:
+        problem.solve(disp=disp)
+        status = "Optimal" if problem.options.APPSTATUS == 1 else "Not Solved"
+        values = np.array([variable.value[0] for variable in variables])
+
+    except Exception as error:
+        # GEKKO lanza una excepción cuando APOPT no encuentra solución.
+        status = f"Error: {error}".strip()
+        values = np.zeros(model.variables_count)
+
+    solve_seconds = stopwatch.lap()
+
+    return SolveResult(backend="gekko",
+                       status=status,
+                       objective=float(model.objective @ values),
+                       values=values,
+                       build_seconds=build_seconds,
+                       solve_seconds=solve_seconds)
+
+
+# ------------------------------------------------------------
+
+BACKENDS = {
+    "pulp": solve_with_pulp,
+    "pyomo": solve_with_pyomo,
+    "gekko": solve_with_gekko,
+    # CBC sobre un MPS escrito directamente desde la matriz del modelo.
+    "cbc": solve_with_cbc,
+    # Asignación FIFO golosa, sin solucionador.
+    "greedy": solve_with_greedy,
+    # Flujo en redes para las componentes sin filas de volumen activas y MIP
+    # (`fallback_backend`) para el resto.
+    "flow": solve_with_assignment_engine,
+    # Carrera entre los solucionadores instalados sobre el mismo MPS; gana el
+    # primero que demuestra el óptimo o llega a `target_gap`.
+    "portfolio": solve_with_portfolio,
+}
+
+
+# Con `warm_start=True` la asignación FIFO golosa se entrega al solucionador
+# como solución inicial. Con `decompose=True` cada componente conexa del
+# modelo se resuelve por separado en un grupo de procesos (ver
+# `decomposition.py`; acepta `max_workers`). Con `presolve=True` se resuelve
+# el modelo reducido por `presolve.Presolve` y la solución se desagrega.
+def solve_model(model, backend="pulp", warm_start=False, decompose=False,
+                presolve=False, **options):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend!r}. "
+                         f"Opciones: {', '.join(BACKENDS)}")
+
+    if presolve:
+        from presolve import solve_presolved
+        return solve_presolved(model, backend, warm_start=warm_start,
+                               decompose=decompose, **options)
+
+    if decompose:
+        from decomposition import solve_decomposed
+        return solve_decomposed(model, backend, warm_start=warm_start, **options)
+
+    if warm_start and backend != "greedy":
+        options["initial_values"] = greedy_fifo_allocation(model)
+
+    return BACKENDS[backend](model, **options)
+
+
+# Resuelve el modelo y muestra tamaño, tiempos y lotes asignados. Con
+# `profile` (ver `profiling.RunProfile`) registra como fases la traducción al
+# solucionador y el solucionador (los tiempos de `SolveResult`) y la
+# extracción de resultados, junto con el tamaño y el estado.
+def run(model, backend="pulp", verbose=True, profile=None, **options):
+    def phase(name):
+        return nullcontext() if profile is None else profile.phase(name)
+
+    result = solve_model(model, backend, **options)
+
+    if profile is not None:
+        profile.add_phase("traduccion", result.build_seconds)
+        profile.add_phase("solucionador", result.solve_seconds)
+
+    print_model_size(backend, model.variables_count, model.constraints_count,
+                     result.build_seconds, model.nonzeros)
+    print(result)
+
+    with phase("extraccion"):
+        assigned = model.assigned_pairs(result.values)
+
+    if profile is not None:
+        profile.record_model(model)
+        profile.record_result(result)
+
+    if verbose:
+        for client, batch in assigned:
+            print(f"Lote {batch} asignado a Cliente {client}")
+
+    print("Total de lotes asignados:", len(assigned))
+
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    from tables import Dataset
+    from parameters import ModelParameters
+    from model_builder import build_allocation_model
+
+    # Compara los backends indicados sobre la misma instancia.
+    backends = sys.argv[1:] or list(BACKENDS)
+
+    parameters = ModelParameters(Dataset())
+    allocation_model = build_allocation_model(parameters, sale_excess=15)
+
+    for backend_name in backends:
+        try:
+            run(allocation_model, backend_name, verbose=False)
+
+        except Exception as error:
+            print(f"[{backend_name}] Error: {error}")
@@ -0,0 +1,439 @@
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+# -------------===================== MODELO =====================------------ #
+# Representación intermedia del modelo de asignación, independiente del
+# solucionador. Cada backend (ver `model_backends.py`) la traduce a su propia
+# API, de modo que todos resuelven exactamente la misma instancia.
+#
+#   max  Σ_k objective[k] * X_k
+#   s.a. Σ_k A[r, k] * X_k <= rhs[r]       ∀ r
+#        0 <= X_k <= upper[k],  X_k entera
+#
+# Cada variable X_k corresponde a un par compatible (cliente, lote); la matriz
+# de restricciones A se guarda en formato CSR (indptr, indices, data).
+
+# Modos de función objetivo.
+OBJECTIVE_COUNT = "count"  # Σ X_cb: cantidad de lotes asignados.
+OBJECTIVE_FIFO = "fifo"    # Σ w_cb X_cb: toneladas ponderadas por prioridad y antigüedad.
+
+# Tipos de restricción (fila).
+ROW_BATCH_UNIQUE = 0  # Σ_c (X_cb) <= 1                                   ∀ b ∈ B
+ROW_DISPATCH_LIMIT = 1  # Σ_{b ∈ B_p} (X_cb * V_b) <= D_cp + sale_excess  ∀ c ∈ C, p ∈ P
+ROW_SYMMETRY = 2  # Σ_c (X_cb') - Σ_c (X_cb) <= 0   b, b' equivalentes, V_b <= V_b'
+
+
+class AllocationModel:
+    def __init__(self,
+                 clients, batches, products,
+                 pair_client, pair_batch,
+                 objective, upper,
+                 row_kind, row_entity,
+                 indptr, indices, data, rhs,
+                 client_priority=None, batch_ship_date=None,
+                 batch_volume=None, batch_product=None):
+        # Conjuntos (IDs).
+        self.clients = clients
+        self.batches = batches
+        self.products = products
+
+        # Variables: posición del cliente y del lote de cada par.
+        self.pair_client = pair_client
+        self.pair_batch = pair_batch
+
+        self.objective = objective
+        self.upper = upper
+
+        # Restricciones: tipo, entidad (lote, cliente * |P| + producto, o el
+        # lote más pesado de una fila de simetría) y matriz CSR con su lado
+        # derecho.
+        self.row_kind = row_kind
+        self.row_entity = row_entity
+
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.rhs = rhs
+
+        # Atributos de clientes y lotes que usan las heurísticas (ver
+        # `heuristics.py`) y la tabla de asignación: prioridad P_c, fecha nave
+        # (epoch), volumen V_b y posición del producto de cada lote.
+        self.client_priority = client_priority
+        self.batch_ship_date = batch_ship_date
+        self.batch_volume = batch_volume
+        self.batch_product = batch_product
+
+    def __repr__(self):
+        return (f"AllocationModel({self.variables_count} variables, "
+                f"{self.constraints_count} restricciones, {self.nonzeros} no nulos)")
+
+    @property
+    def variables_count(self):
+        return len(self.pair_client)
+
+    @property
+    def constraints_count(self):
+        return len(self.rhs)
+
+    @property
+    def nonzeros(self):
+        return len(self.data)
+
+    def row(self, row):
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def variable_name(self, variable):
+        return (f"X_{self.clients[self.pair_client[variable]]}"
+                f"_{self.batches[self.pair_batch[variable]]}")
+
+    def constraint_name(self, row):
+        entity = self.row_entity[row]
+
+        if self.row_kind[row] == ROW_BATCH_UNIQUE:
+            return f"Unicidad_{self.batches[entity]}"
+
+        if self.row_kind[row] == ROW_SYMMETRY:
+            return f"Simetria_{self.batches[entity]}"
+
+        client, product = divmod(int(entity), len(self.products))
+        return f"Limite_{self.clients[client]}_{self.products[product]}"
+
+    # Submodelo con solo las columnas `columns` (en ese orden). Las filas que
+    # quedan sin términos se eliminan.
+    def restrict(self, columns):
+        columns = np.asarray(columns, dtype=np.int64)
+
+        new_index = np.full(self.variables_count, -1, dtype=np.int64)
+        new_index[columns] = np.arange(len(columns))
+
+        keep = new_index[self.indices] >= 0
+        row_of_entry = np.repeat(np.arange(self.constraints_count), np.diff(self.indptr))
+        row_counts = np.bincount(row_of_entry[keep], minlength=self.constraints_count)
+        rows = np.flatnonzero(row_counts)
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(row_counts[rows], out=indptr[1:])
+
+        return AllocationModel(
+            clients=self.clients,
+            batches=self.batches,
+            products=self.products,
+            pair_client=self.pair_client[columns],
+            pair_batch=self.pair_batch[columns],
+            objective=self.objective[columns],
+            upper=self.upper[columns],
+            row_kind=self.row_kind[rows],
+            row_entity=self.row_entity[rows],
+            indptr=indptr,
+            indices=new_index[self.indices[keep]],
+            data=self.data[keep],
+            rhs=self.rhs[rows],
+            client_priority=self.client_priority,
+            batch_ship_date=self.batch_ship_date,
+            batch_volume=self.batch_volume,
+            batch_product=self.batch_product,
+        )
+
+    # Tabla de asignación a partir de `values` (alineado con las columnas, como
+    # `SolveResult.values`): una fila por par con X_k >= 0.5 (o por cada par
+    # con `assigned_only=False`). Los IDs salen de los índices del par, sin
+    # leer nombres de variables.
+    def assignment_table(self, values, assigned_only=True):
+        values = np.asarray(values, dtype=float)
+        columns = (np.flatnonzero(values >= 0.5) if assigned_only
+                   else np.arange(self.variables_count))
+
+        clients = self.pair_client[columns]
+        batches = self.pair_batch[columns]
+
+        table = pd.DataFrame({
+            "client_id": pd.Series(np.asarray(self.clients)[clients], dtype="int64"),
+            "batch_id": pd.Series(np.asarray(self.batches, dtype=object)[batches],
+                                  dtype="string"),
+            "value": np.rint(values[columns]).astype(np.int64),
+        })
+
+        if self.batch_product is not None:
+            table["product_id"] = pd.Series(
+                np.asarray(self.products, dtype=object)[self.batch_product[batches]],
+                dtype="string"
+            )
+
+        if self.batch_volume is not None:
+            table["mass"] = self.batch_volume[batches]
+
+        if self.batch_ship_date is not None:
+            table["ship_date_epoch"] = self.batch_ship_date[batches]
+
+        if self.client_priority is not None:
+            table["priority"] = self.client_priority[clients]
+
+        table.index = pd.Index(columns, name="column")
+        return table
+
+    # Pares (client_id, batch_id) con X_k = 1 en `values`.
+    def assigned_pairs(self, values):
+        table = self.assignment_table(values)
+        return list(zip(table["client_id"].tolist(), table["batch_id"].tolist()))
+
+
+# ------------------------------------------------------------
+
+# Agrupa las posiciones de `keys` por valor: (claves únicas, orden, indptr).
+def _group(keys):
+    order = np.argsort(keys, kind="stable")
+    unique, counts = np.unique(keys[order], return_counts=True)
+
+    indptr = np.zeros(len(unique) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    return unique, order, indptr
+
+
+# values / scale, o `default` en todas las posiciones si la escala no es positiva.
+def _scaled(values, scale, default=0.0):
+    if scale > 0:
+        return values / scale
+
+    return np.full(len(values), default)
+
+
+# Coeficientes del objetivo por par, calculados con arreglos de lotes y
+# clientes (sin recorrer pares en Python):
+#
+#   count: w_cb = 1
+#   fifo:  w_cb = V_b / mean(V) * (1 + P_c / max(P) + batch_egress_weight * T_b / max(T))
+#
+# En el modo fifo se prefieren los lotes con más toneladas y, sobre todo, los
+# más antiguos (T_b, en días desde la fecha nave; los lotes con fecha futura
+# cuentan como 0); la prioridad del cliente desempata.
+#
+# mean(V), max(T) y max(P) dependen de todos los lotes y clientes: agregar o
+# editar uno solo cambia los coeficientes de todas las columnas. Quien
+# necesite coeficientes estables entre modelos (ver `session.py`) calcula
+# las escalas una vez con `objective_scales` y las pasa en `scales`.
+def objective_scales(parameters):
+    volume = parameters.volume.astype(float)
+    age = np.clip(parameters.age_days, 0, None).astype(float)
+    priority = parameters.priority.astype(float)
+
+    return {"volume": float(volume.mean()) if len(volume) else 0.0,
+            "age": float(age.max()) if len(age) else 0.0,
+            "priority": float(priority.max()) if len(priority) else 0.0}
+
+
+def objective_coefficients(parameters, pair_client, pair_batch,
+                           objective=OBJECTIVE_COUNT, batch_egress_weight=7, scales=None):
+    if objective == OBJECTIVE_COUNT:
+        return np.ones(len(pair_client))
+
+    if objective != OBJECTIVE_FIFO:
+        raise ValueError(f"Objetivo desconocido: {objective!r}. "
+                         f"Opciones: {OBJECTIVE_COUNT}, {OBJECTIVE_FIFO}")
+
+    if scales is None:
+        scales = objective_scales(parameters)
+
+    volume = parameters.volume.astype(float)
+    age = np.clip(parameters.age_days, 0, None).astype(float)
+    priority = parameters.priority.astype(float)
+
+    volume_score = _scaled(volume, scales["volume"], default=1.0)
+    age_score = _scaled(age, scales["age"])
+    priority_score = _scaled(priority, scales["priority"])
+
+    return (volume_score[pair_batch]
+            * (1 + priority_score[pair_client]
+               + batch_egress_weight * age_score[pair_batch]))
+
+
+# Clases de lotes equivalentes: mismo producto, planta (ubicación del lote),
+# fecha nave y clientes aptos. Devuelve la etiqueta de clase de cada lote.
+def interchangeable_classes(parameters):
+    key = np.column_stack([parameters.batch_product,
+                           parameters.ship_date_epoch,
+                           parameters.batch_location,
+                           parameters.aptitude.matrix.T]).astype(np.int64)
+
+    _, labels = np.unique(key, axis=0, return_inverse=True)
+    return labels.ravel()
+
+
+# Filas de simetría: dentro de cada clase, ordenada por volumen ascendente,
+# un lote solo se asigna si el anterior (más liviano) también se asigna. Es
+# válido porque cambiar el lote más pesado por el más liviano en el mismo
+# cliente mantiene la factibilidad (la fila de despacho baja) y no empeora el
+# objetivo; por eso solo se encadenan pares en que el más liviano tiene, para
+# cada cliente, un coeficiente mayor o igual (siempre con el objetivo
+# "count"; con "fifo" solo los de igual volumen). Devuelve (indptr, indices,
+# data, entity) de las filas nuevas.
+def symmetry_rows(parameters, objective, batch_start, batch_end):
+    labels = interchangeable_classes(parameters)
+    order = np.lexsort((np.arange(len(labels)), parameters.volume, labels))
+
+    lengths = []
+    indices = []
+    data = []
+    entity = []
+
+    for lighter, heavier in zip(order[:-1].tolist(), order[1:].tolist()):
+        if labels[lighter] != labels[heavier]:
+            continue
+
+        lighter_columns = np.arange(batch_start[lighter], batch_end[lighter])
+        heavier_columns = np.arange(batch_start[heavier], batch_end[heavier])
+
+        if not len(heavier_columns) or \
+                np.any(objective[lighter_columns] < objective[heavier_columns] - 1e-9):
+            continue
+
+        lengths.append(len(lighter_columns) + len(heavier_columns))
+        indices.extend([heavier_columns, lighter_columns])
+        data.extend([np.ones(len(heavier_columns)), -np.ones(len(lighter_columns))])
+        entity.append(heavier)
+
+    indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+
+    return (indptr,
+            np.concatenate(indices).astype(np.int64) if indices else np.zeros(0, np.int64),
+            np.concatenate(data) if data else np.zeros(0),
+            np.array(entity, dtype=np.int64))
+
+
+# Construye el modelo a partir de los parámetros (ver `ModelParameters`).
+# Solo se crean variables para los pares con A_cb = 1, por lo que X_cb <= A_cb
+# queda implícita; las filas sin términos se omiten. `objective` y
+# `batch_egress_weight` eligen la función objetivo (ver
+# `objective_coefficients`; `scales` fija sus constantes de normalización).
+# Con `symmetry_breaking=True` se agregan las filas de simetría entre lotes
+# equivalentes (ver `symmetry_rows`).
+def build_allocation_model(parameters, sale_excess,
+                           objective=OBJECTIVE_COUNT, batch_egress_weight=7,
+                           symmetry_breaking=False, scales=None):
+    matrix = parameters.aptitude.matrix
+    products_count = len(parameters.products)
+
+    # Pares compatibles, recorridos lote a lote.
+    pair_batch, pair_client = np.nonzero(matrix.T)
+    pair_batch = pair_batch.astype(np.int64)
+    pair_client = pair_client.astype(np.int64)
+    pair_product = parameters.batch_product[pair_batch]
+    variables_count = len(pair_client)
+
+    # Cada lote puede ser enviado hasta una sola vez.
+    unique_batches, unique_order, unique_indptr = _group(pair_batch)
+
+    # No se puede vender más de `sale_excess` toneladas por sobre lo que un
+    # cliente pide de cada producto; solo suman los lotes de ese producto.
+    dispatch_keys, dispatch_order, dispatch_indptr = _group(
+        pair_client * products_count + pair_product
+    )
+    dispatch_clients, dispatch_products = np.divmod(dispatch_keys, products_count)
+
+    indptr = np.concatenate([unique_indptr,
+                             unique_indptr[-1] + dispatch_indptr[1:]])
+    indices = np.concatenate([unique_order, dispatch_order]).astype(np.int64)
+    data = np.concatenate([np.ones(variables_count),
+                           parameters.volume[pair_batch[dispatch_order]]])
+    rhs = np.concatenate([np.ones(len(unique_batches)),
+                          parameters.demand[dispatch_clients, dispatch_products] + sale_excess])
+
+    row_kind = np.concatenate([np.full(len(unique_batches), ROW_BATCH_UNIQUE, dtype=np.int8),
+                               np.full(len(dispatch_keys), ROW_DISPATCH_LIMIT, dtype=np.int8)])
+    row_entity = np.concatenate([unique_batches, dispatch_keys]).astype(np.int64)
+
+    coefficients = objective_coefficients(parameters, pair_client, pair_batch,
+                                          objective, batch_egress_weight, scales)
+
+    if symmetry_breaking:
+        # Las columnas de cada lote son contiguas (pares recorridos lote a lote).
+        batch_start = np.searchsorted(pair_batch, np.arange(len(parameters.batches)))
+        batch_end = np.searchsorted(pair_batch, np.arange(len(parameters.batches)),
+                                    side="right")
+
+        symmetry_indptr, symmetry_indices, symmetry_data, symmetry_entity = \
+            symmetry_rows(parameters, coefficients, batch_start, batch_end)
+
+        indptr = np.concatenate([indptr, indptr[-1] + symmetry_indptr[1:]])
+        indices = np.concatenate([indices, symmetry_indices])
+        data = np.concatenate([data, symmetry_data])
+        rhs = np.concatenate([rhs, np.zeros(len(symmetry_entity))])
+        row_kind = np.concatenate([row_kind, np.full(len(symmetry_entity), ROW_SYMMETRY,
+                                                     dtype=np.int8)])
+        row_entity = np.concatenate([row_entity, symmetry_entity])
+
+    return AllocationModel(
+        clients=parameters.clients,
+        batches=parameters.batches,
+        products=parameters.products,
+        pair_client=pair_client,
+        pair_batch=pair_batch,
+        objective=coefficients,
+        upper=np.ones(variables_count),
+        row_kind=row_kind,
+        row_entity=row_entity,
+        indptr=indptr,
+        indices=indices,
+        data=data,
+        rhs=rhs,
+        client_priority=parameters.priority,
+        batch_ship_date=parameters.ship_date_epoch,
+        batch_volume=parameters.volume,
+        batch_product=parameters.batch_product,
+    )
+
+
+# ------------------------------------------------------------
+
+# `bound` es la mejor cota superior del objetivo que informó el solucionador
+# (None si no la informa); con ella se calcula el gap relativo.
+class SolveResult:
+    def __init__(self, backend, status, objective, values,
+                 build_seconds, solve_seconds, bound=None):
+        self.backend = backend
+        self.status = status
+        self.objective = objective
+        self.values = values
+        self.build_seconds = build_seconds
+        self.solve_seconds = solve_seconds
+        self.bound = bound
+
+    @property
+    def gap(self):
+        if self.bound is None or self.objective is None:
+            return None
+
+        return abs(self.bound - self.objective) / max(abs(self.objective), 1e-9)
+
+    def __str__(self):
+        gap_text = "" if self.gap is None else f" | Gap: {self.gap:.2%}"
+
+        return (f"[{self.backend}] Estado: {self.status} | "
+                f"Objetivo: {self.objective}{gap_text} | "
+                f"Construcción: {self.build_seconds:.3f} s | "
+                f"Resolución: {self.solve_seconds:.3f} s")
+
+
+class Stopwatch:
+    def __init__(self):
+        self.start = perf_counter()
+
+    def lap(self):
+        now = perf_counter()
+        seconds = now - self.start
+        self.start = now
+        return seconds
+
+
+def print_model_size(backend, variables_count, constraints_count, build_seconds,
+                     nonzeros=None):
+    nonzeros_text = "" if nonzeros is None else f" | No nulos: {nonzeros}"
+
+    print(f"[{backend}] Variables: {variables_count} | "
+          f"Restricciones: {constraints_count}{nonzeros_text} | "
+          f"Construcción: {build_seconds:.3f} s")
@@ -0,0 +1,198 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch
+
+
+# Escritura directa en formato MPS desde la matriz CSR del `AllocationModel`,
+# sin pasar por expresiones de PuLP. Filas R{r}, columnas X{k} (k = posición
+# del par en el modelo). MPS minimiza, así que el objetivo se escribe negado.
+# Se usa MPS libre (campos separados por espacios): la palabra FREE en la
+# tarjeta NAME se lo indica a CBC. GLPK (--freemps) y HiGHS leen el formato
+# libre sin esa marca y la tomarían como parte del nombre; para ellos se
+# escribe con `free=False`.
+
+WRITE_CHUNK_LINES = 100_000
+
+
+def _write_lines(file, lines):
+    for start in range(0, len(lines), WRITE_CHUNK_LINES):
+        file.write("\n".join(lines[start:start + WRITE_CHUNK_LINES]))
+        file.write("\n")
+
+
+def write_mps(model, path, free=True):
+    rows_count = model.constraints_count
+    variables_count = model.variables_count
+
+    # Entradas por columna: primero el objetivo y luego las filas (CSC).
+    row_of_entry = np.repeat(np.arange(rows_count), np.diff(model.indptr))
+
+    entry_col = np.concatenate([np.arange(variables_count), model.indices])
+    entry_row = np.concatenate([np.full(variables_count, -1), row_of_entry])
+    entry_value = np.concatenate([-model.objective, model.data])
+
+    order = np.argsort(entry_col, kind="stable")
+
+    with open(path, "w", encoding="ascii") as file:
+        file.write("NAME ASIGNACION FREE\n" if free else "NAME ASIGNACION\n")
+
+        file.write("ROWS\n N OBJ\n")
+        _write_lines(file, [f" L R{row}" for row in range(rows_count)])
+
+        file.write("COLUMNS\n")
+        file.write(" MARKER 'MARKER' 'INTORG'\n")
+        _write_lines(file, [
+            f" X{col} {'OBJ' if row < 0 else f'R{row}'} {value:.12g}"
+            for col, row, value in zip(entry_col[order].tolist(),
+                                       entry_row[order].tolist(),
+                                       entry_value[order].tolist())
+        ])
+        file.write(" MARKER 'MARKER' 'INTEND'\n")
+
+        file.write("RHS\n")
+        _write_lines(file, [f" RHS R{row} {value:.12g}"
+                            for row, value in enumerate(model.rhs.tolist())])
+
+        file.write("BOUNDS\n")
+        _write_lines(file, [f" UP BND X{col} {value:.12g}"
+                            for col, value in enumerate(model.upper.tolist())])
+
+        file.write("ENDATA\n")
+
+
+# ------------------------------------------------------------
+
+def get_cbc_path():
+    try:
+        import pulp
+        return pulp.PULP_CBC_CMD().path
+
+    except ImportError:
+        return shutil.which("cbc")
+
+
+# Lee el archivo de `-solu` de CBC. La primera línea trae el estado y el
+# objetivo; las demás, "índice nombre valor costo_reducido" para las columnas
+# no nulas (CBC antepone "**" a las que violan alguna cota).
+def read_cbc_solution(path, variables_count):
+    values = np.zeros(variables_count)
+
+    with open(path, encoding="ascii", errors="replace") as file:
+        header = file.readline()
+        status, _, objective_text = header.partition(" - objective value ")
+
+        for line in file:
+            tokens = line.split()
+
+            if tokens and tokens[0] == "**":
+                tokens = tokens[1:]
+
+            if len(tokens) < 3:
+                continue
+
+            values[int(tokens[0])] = float(tokens[2])
+
+    objective = float(objective_text) if objective_text.strip() else None
+
+    return status.strip(), objective, values
+
+
+# Cota del log de CBC: "Lower bound:" / "Upper bound:" cuando se detiene antes
+# del óptimo; si lo demuestra, la cota es el propio objetivo. Con `negated`
+# (el MPS de `write_mps` minimiza el objetivo negado) se devuelve con el
+# signo del modelo; PuLP llama a CBC con -max y el log ya viene en ese signo.
+def read_cbc_bound(log_text, negated=True):
+    sign = -1 if negated else 1
+    summary = {}
+
+    for line in log_text.splitlines():
+        label, _, value = line.partition(":")
+
+        try:
+            summary[label.strip()] = float(value)
+        except ValueError:
+            continue
+
+    for label in ("Lower bound", "Upper bound"):
+        if label in summary:
+            return sign * summary[label]
+
+    if "Optimal solution found" in log_text and "Objective value" in summary:
+        return sign * summary["Objective value"]
+
+    return None
+
+
+# Solución inicial en el mismo formato que el archivo de solución de CBC,
+# para la opción `-mips`.
+def write_cbc_mipstart(values, path):
+    with open(path, "w", encoding="ascii") as file:
+        file.write("Stopped on time - objective value 0\n")
+        _write_lines(file, [f"{col:>7} X{col} {value:>15.12g} 0"
+                            for col, value in enumerate(values.tolist())])
+
+
+def solve_with_cbc(model, time_limit=5, msg=False, cbc_path=None, work_dir=None,
+                   initial_values=None):
+    if cbc_path is None:
+        cbc_path = get_cbc_path()
+
+    if cbc_path is None:
+        raise FileNotFoundError("No se encontró el ejecutable de CBC")
+
+    stopwatch = Stopwatch()
+
+    tmp_dir = tempfile.mkdtemp(dir=work_dir)
+    mps_path = os.path.join(tmp_dir, "model.mps")
+    solution_path = os.path.join(tmp_dir, "model.sol")
+    mipstart_path = os.path.join(tmp_dir, "model.mst")
+
+    try:
+        write_mps(model, mps_path)
+
+        command = [cbc_path, mps_path]
+
+        if initial_values is not None:
+            write_cbc_mipstart(initial_values, mipstart_path)
+            command += ["-mips", mipstart_path]
+
+        build_seconds = stopwatch.lap()
+
+        if time_limit is not None:
+            command += ["-sec", str(time_limit)]
+        command += ["-solve", "-solu", solution_path]
+
+        completed = subprocess.run(command,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT,
+                                   text=True,
+                                   check=False)
+
+        if msg:
+            print(completed.stdout)
+
+        solve_seconds = stopwatch.lap()
+
+        if os.path.exists(solution_path):
+            status, objective, values = read_cbc_solution(solution_path,
+                                                          model.variables_count)
+        else:
+            status, objective, values = "Not Solved", None, np.zeros(model.variables_count)
+
+        bound = read_cbc_bound(completed.stdout)
+
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return SolveResult(backend="cbc",
+                       status=status,
+                       objective=None if objective is None else -objective,
+                       values=values,
+                       build_seconds=build_seconds,
+                       solve_seconds=solve_seconds,
+                       bound=bound)
@@ -0,0 +1,171 @@
+from collections.abc import Mapping
+from itertools import product
+from time import time
+
+import numpy as np
+import pandas as pd
+
+
+# ------------------------------------------------------------
+
+# Vista de solo lectura sobre un arreglo denso indexado por IDs.
+# P[(client, )], P[client], D[(client, product)], ... devuelven el valor del
+# arreglo; las claves fuera de los conjuntos devuelven `default`, igual que
+# los diccionarios completados con `setdefault` en los scripts de modelo.
+class ArrayParameter(Mapping):
+    def __init__(self, array, *keys, default=0):
+        self.array = array
+        self.keys_by_axis = [list(axis_keys) for axis_keys in keys]
+        self.indexes = [{key: index for index, key in enumerate(axis_keys)}
+                        for axis_keys in self.keys_by_axis]
+        self.default = default
+
+    def _position(self, key):
+        if not isinstance(key, tuple):
+            key = (key, )
+
+        if len(key) != len(self.indexes):
+            return None
+
+        position = []
+
+        for axis_key, index in zip(key, self.indexes):
+            axis_position = index.get(axis_key)
+
+            if axis_position is None:
+                return None
+
+            position.append(axis_position)
+
+        return tuple(position)
+
+    def __getitem__(self, key):
+        position = self._position(key)
+
+        if position is None:
+            return self.default
+
+        return self.array[position].item()
+
+    def __contains__(self, key):
+        return self._position(key) is not None
+
+    def __iter__(self):
+        return product(*self.keys_by_axis)
+
+    def __len__(self):
+        return self.array.size
+
+    # Solo las entradas distintas de `default` (para Param(..., default=...)).
+    def sparse_dict(self):
+        positions = np.argwhere(self.array != self.default)
+
+        return {
+            (tuple(axis_keys[index] for axis_keys, index in zip(self.keys_by_axis, position))
+             if len(self.keys_by_axis) > 1
+             else self.keys_by_axis[0][position[0]]):
+                self.array[tuple(position)].item()
+            for position in positions.tolist()
+        }
+
+
+# ------------------------------------------------------------
+
+# Posición de cada valor de `values` dentro de `keys` (-1 si no está).
+def _positions(keys, values):
+    return pd.Index(keys).get_indexer(values)
+
+
+# Parámetros del modelo como arreglos alineados con los conjuntos del Dataset:
+#   priority[c]            P_c   Prioridad de ventas del cliente.
+#   volume[b]              V_b   Volumen disponible del lote.
+#   ship_date_epoch[b]           Fecha nave del lote (epoch).
+#   age_days[b]            T_b   Antigüedad del lote en días.
+#   demand[c, p]           D_cp  Demanda del cliente por producto.
+#   client_location[c, l]  LC_cl Cliente c en la ubicación l.
+#   batch_location[b, l]   LB_b  Lote b en la ubicación l.
+#   batch_product[b]             Posición del producto del lote en `products`.
+#   aptitude               A_cb  Matriz de aptitud (CompatibilityMatrix).
+class ModelParameters:
+    def __init__(self, dataset, now=None):
+        if now is None:
+            now = time()
+
+        self.clients = dataset.clients
+        self.batches = dataset.batches
+        self.products = dataset.products
+        self.locations = dataset.locations
+
+        # Prioridad de ventas para el cliente c ∈ C.
+        priorities = dataset.clients_priorities_table
+        self.priority = np.zeros(len(self.clients), dtype=float)
+        self.priority[_positions(self.clients, priorities["client_id"])] = \
+            priorities["priority"].to_numpy(dtype=float)
+
+        # Volumen, fecha nave y producto del lote b ∈ B.
+        volumes = dataset.batches_volumes_table
+        batch_rows = _positions(self.batches, volumes["batch_id"])
+
+        self.volume = np.zeros(len(self.batches), dtype=float)
+        self.volume[batch_rows] = volumes["quantity"].to_numpy(dtype=float)
+
+        self.ship_date_epoch = np.zeros(len(self.batches), dtype=np.int64)
+        self.ship_date_epoch[batch_rows] = volumes["ship_date_epoch"].to_numpy(dtype=np.int64)
+
+        self.batch_product = np.full(len(self.batches), -1, dtype=np.int64)
+        self.batch_product[batch_rows] = _positions(self.products, volumes["product_id"])
+
+        # Antigüedad del lote b ∈ B en días.
+        self.age_days = (now - self.ship_date_epoch) // (24 * 3600)
+
+        # Demanda del cliente c ∈ C para el producto p ∈ P.
+        sales = dataset.sales_table
+        self.demand = np.zeros((len(self.clients), len(self.products)), dtype=float)
+        self.demand[_positions(self.clients, sales["client_id"]),
+                    _positions(self.products, sales["product_id"])] = \
+            sales["demand"].to_numpy(dtype=float)
+
+        # Cliente c ∈ C en la ubicación l ∈ L.
+        client_locations = dataset.clients_locations_table
+        self.client_location = np.zeros((len(self.clients), len(self.locations)), dtype=bool)
+        self.client_location[_positions(self.clients, client_locations["client_id"]),
+                             _positions(self.locations, client_locations["client_location"])] = True
+
+        # Lote b ∈ B en la ubicación l ∈ L.
+        batch_locations = dataset.batches_locations_table
+        self.batch_location = np.zeros((len(self.batches), len(self.locations)), dtype=bool)
+        self.batch_location[_positions(self.batches, batch_locations["batch_id"]),
+                            _positions(self.locations, batch_locations["batch_location"])] = True
+
+        # Lote b ∈ B apto para el cliente c ∈ C.
+        self.aptitude = dataset.compatibility_matrix
+
+    # Vistas con la misma forma de acceso que los diccionarios de parámetros.
+
+    @property
+    def P_c(self):
+        return ArrayParameter(self.priority, self.clients)
+
+    @property
+    def A_cb(self):
+        return self.aptitude
+
+    @property
+    def V_b(self):
+        return ArrayParameter(self.volume, self.batches)
+
+    @property
+    def D_cp(self):
+        return ArrayParameter(self.demand, self.clients, self.products)
+
+    @property
+    def T_b(self):
+        return ArrayParameter(self.age_days, self.batches, default=1)
+
+    @property
+    def LC_cl(self):
+        return ArrayParameter(self.client_location.astype(int), self.clients, self.locations)
+
+    @property
+    def LB_b(self):
+        return ArrayParameter(self.batch_location.astype(int), self.batches, self.locations)
@@ -0,0 +1,353 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from time import perf_counter, sleep
+
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch
+from mps_writer import (write_mps, write_cbc_mipstart, read_cbc_solution,
+                        read_cbc_bound, get_cbc_path)
+
+
+# ## Portafolio de solucionadores
+# El modelo se exporta una sola vez a MPS y cada solucionador instalado
+# corre en su propio subproceso sobre el mismo archivo. Apenas uno demuestra
+# el óptimo (o llega a `target_gap`) se detienen los demás, así que la
+# latencia es la del solucionador más rápido para esa instancia. Si ninguno
+# termina así (todos se detienen por tiempo), se queda el mejor objetivo.
+#
+#   cbc            CBC incluido con PuLP (o el del PATH).
+#   glpk           glpsol --freemps (GLPSOL_PATH o PATH).
+#   highs          highs (HIGHS_PATH o PATH).
+#   cbc-strategy2  CBC con otra estrategia y otra semilla. Solo corre si se
+#                  pide en `solvers` (ver `OPT_IN_SOLVERS`): repite el
+#                  trabajo de cbc y le quita núcleos.
+
+POLL_SECONDS = 0.02
+
+# Margen sobre `time_limit` para que los solucionadores escriban su solución.
+GRACE_SECONDS = 5
+
+
+def get_glpsol_path():
+    return os.environ.get("GLPSOL_PATH") or shutil.which("glpsol")
+
+
+def get_highs_path():
+    return os.environ.get("HIGHS_PATH") or shutil.which("highs")
+
+
+# ------------------------------------------------------------
+
+# Comandos: reciben el ejecutable, el directorio de trabajo del solucionador
+# y las opciones de la carrera; devuelven la línea de comando.
+
+# El límite de CBC se mide en tiempo de reloj (por omisión es de CPU, que
+# rinde menos cuando los solucionadores comparten núcleos).
+def _cbc_command(executable, files, time_limit, target_gap, has_start, extra=()):
+    command = [executable, files["mps"], "-timeMode", "elapsed", *extra]
+
+    if has_start:
+        command += ["-mips", files["start"]]
+
+    if target_gap:
+        command += ["-ratioGap", str(target_gap)]
+
+    return command + ["-sec", str(time_limit), "-solve", "-solu", files["solution"]]
+
+
+def _cbc_strategy2_command(executable, files, time_limit, target_gap, has_start):
+    return _cbc_command(executable, files, time_limit, target_gap, has_start,
+                        extra=("-strategy", "2", "-randomCbcSeed", "7"))
+
+
+def _glpk_command(executable, files, time_limit, target_gap, has_start):
+    return [executable, "--freemps", files["mps"],
+            "--tmlim", str(max(int(time_limit), 1)),
+            "--mipgap", str(target_gap),
+            "-w", files["solution"]]
+
+
+def _highs_command(executable, files, time_limit, target_gap, has_start):
+    with open(files["options"], "w", encoding="ascii") as file:
+        file.write(f"mip_rel_gap = {target_gap}\n")
+
+    return [executable, "--model_file", files["mps"],
+            "--time_limit", str(time_limit),
+            "--options_file", files["options"],
+            "--solution_file", files["solution"]]
+
+
+# Lectores: devuelven (estado, objetivo, valores, cota) con el signo del
+# modelo (el MPS minimiza el objetivo negado).
+
+def _read_cbc(files, log_text, variables_count):
+    status, objective, values = read_cbc_solution(files["solution"], variables_count)
+
+    return (status, None if objective is None else -objective, values,
+            read_cbc_bound(log_text))
+
+
+# Archivo de `glpsol -w`: "s mip <filas> <columnas> <estado> <objetivo>" y
+# una línea "j <columna> <valor>" por columna (en el orden del MPS). La cota
+# sale de la última línea de progreso del log con una cota numérica
+# ("mip = <incumbente> >= <cota>"; antes de la primera solución el
+# incumbente es "not found yet" y al terminar la cota es "tree is empty").
+GLPK_STATUS = {"o": "Optimal", "f": "Feasible", "n": "Infeasible", "u": "Not Solved"}
+GLPK_PROGRESS = re.compile(r"mip =\s*(.+?)\s*>=\s*(\S+)")
+
+
+def _read_glpk(files, log_text, variables_count):
+    status, objective = "Not Solved", None
+    values = np.zeros(variables_count)
+
+    with open(files["solution"], encoding="ascii", errors="replace") as file:
+        for line in file:
+            tokens = line.split()
+
+            if tokens[:2] == ["s", "mip"]:
+                status = GLPK_STATUS.get(tokens[4], tokens[4])
+
+                if tokens[4] in ("o", "f"):
+                    objective = -float(tokens[5])
+
+            elif tokens and tokens[0] == "j":
+                values[int(tokens[1]) - 1] = float(tokens[2])
+
+    bound = objective if status == "Optimal" else None
+
+    if bound is None:
+        for _, progress_bound in reversed(GLPK_PROGRESS.findall(log_text)):
+            try:
+                bound = -float(progress_bound)
+                break
+            except ValueError:
+                continue
+
+    return status, objective, values, bound
+
+
+# Archivo de `highs --solution_file`: "Model status", el estado, "Objective
+# <valor>" y, tras "# Columns <n>", una línea "<nombre> <valor>" por columna.
+def _read_highs(files, log_text, variables_count):
+    status, objective = "Not Solved", None
+    values = np.zeros(variables_count)
+
+    with open(files["solution"], encoding="ascii", errors="replace") as file:
+        lines = file.read().splitlines()
+
+    for position, line in enumerate(lines):
+        if line.startswith("Model status") and position + 1 < len(lines):
+            status = lines[position + 1].strip()
+
+        elif line.startswith("Objective") and objective is None:
+            objective = -float(line.split()[-1])
+
+        elif line.startswith("# Columns"):
+            for entry in lines[position + 1:position + 1 + variables_count]:
+                name, value = entry.split()[:2]
+                values[int(name[1:])] = float(value)
+            break
+
+    bound = objective if status == "Optimal" else None
+
+    for line in log_text.splitlines():
+        if line.strip().startswith("Dual bound"):
+            try:
+                bound = -float(line.split()[-1])
+            except ValueError:
+                pass
+
+    return status, objective, values, bound
+
+
+# Nombre -> (ejecutable, comando, lector, MPS con la marca FREE).
+SOLVERS = {
+    "cbc": (get_cbc_path, _cbc_command, _read_cbc, True),
+    "cbc-strategy2": (get_cbc_path, _cbc_strategy2_command, _read_cbc, True),
+    "glpk": (get_glpsol_path, _glpk_command, _read_glpk, False),
+    "highs": (get_highs_path, _highs_command, _read_highs, False),
+}
+
+
+# Solo corren si se piden explícitamente en `solvers`.
+OPT_IN_SOLVERS = {"cbc-strategy2"}
+
+
+def available_solvers(include_opt_in=False):
+    return [name for name, (executable, *_) in SOLVERS.items()
+            if executable() and (include_opt_in or name not in OPT_IN_SOLVERS)]
+
+
+# Un resultado gana la carrera si demuestra el óptimo o llega al gap pedido.
+def _wins(result, target_gap):
+    if result.status.startswith("Optimal"):
+        return True
+
+    return target_gap > 0 and result.gap is not None and result.gap <= target_gap
+
+
+# ------------------------------------------------------------
+
+# Backend "portfolio".
+def solve_with_portfolio(model, solvers=None, time_limit=5, target_gap=0.0,
+                         msg=False, work_dir=None, initial_values=None):
+    if solvers is None:
+        solvers = available_solvers()
+
+    solvers = [name for name in solvers if SOLVERS[name][0]()]
+
+    if not solvers:
+        raise FileNotFoundError("No se encontró ningún solucionador para el portafolio")
+
+    stopwatch = Stopwatch()
+
+    tmp_dir = tempfile.mkdtemp(dir=work_dir)
+    mps_paths = {}
+    processes = {}
+    logs = {}
+    files = {}
+
+    try:
+        for name in solvers:
+            get_executable, build_command, _, free = SOLVERS[name]
+
+            if free not in mps_paths:
+                mps_paths[free] = os.path.join(tmp_dir, "model.mps" if free else "model_plain.mps")
+                write_mps(model, mps_paths[free], free=free)
+
+            solver_dir = os.path.join(tmp_dir, name)
+            os.makedirs(solver_dir)
+
+            files[name] = {"mps": mps_paths[free],
+                           "solution": os.path.join(solver_dir, "model.sol"),
+                           "start": os.path.join(solver_dir, "model.mst"),
+                           "options": os.path.join(solver_dir, "options.txt"),
+                           "log": os.path.join(solver_dir, "model.log")}
+
+            if initial_values is not None:
+                write_cbc_mipstart(initial_values, files[name]["start"])
+
+            command = build_command(get_executable(), files[name], time_limit, target_gap,
+                                    initial_values is not None)
+
+            logs[name] = open(files[name]["log"], "w", encoding="utf-8")
+            processes[name] = subprocess.Popen(command, stdout=logs[name],
+                                               stderr=subprocess.STDOUT, cwd=solver_dir)
+
+        build_seconds = stopwatch.lap()
+
+        deadline = perf_counter() + time_limit + GRACE_SECONDS
+        running = dict(processes)
+        results = {}
+        winner = None
+
+        while running and winner is None and perf_counter() < deadline:
+            for name, process in list(running.items()):
+                if process.poll() is not None:
+                    del running[name]
+                    results[name] = _read_result(name, files[name], model.variables_count)
+
+                    if _wins(results[name], target_gap):
+                        winner = name
+                        break
+
+            sleep(POLL_SECONDS)
+
+        if msg:
+            for name in solvers:
+                logs[name].flush()
+                with open(files[name]["log"], encoding="utf-8", errors="replace") as file:
+                    print(f"----- {name} -----\n{file.read()}")
+
+    finally:
+        # Se detienen los que siguen corriendo.
+        for process in processes.values():
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        for log in logs.values():
+            log.close()
+
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    solve_seconds = stopwatch.lap()
+
+    # Sin ganador, el mejor objetivo entre los que terminaron.
+    if winner is None:
+        solved = [name for name, result in results.items() if result.objective is not None]
+
+        if solved:
+            winner = max(solved, key=lambda name: results[name].objective)
+
+    bounds = [result.bound for result in results.values() if result.bound is not None]
+
+    print(f"[portafolio] Ganador: {winner or '-'} | " + " | ".join(
+        f"{name}: {results[name].status if name in results else 'detenido'}"
+        for name in solvers
+    ))
+
+    if winner is None:
+        return SolveResult(backend="portfolio",
+                           status="Not Solved",
+                           objective=None,
+                           values=np.zeros(model.variables_count),
+                           build_seconds=build_seconds,
+                           solve_seconds=solve_seconds,
+                           bound=min(bounds) if bounds else None)
+
+    best = results[winner]
+
+    # Cualquier cota informada es válida; la menor es la más ajustada.
+    return SolveResult(backend=f"portfolio/{winner}",
+                       status=best.status,
+                       objective=best.objective,
+                       values=best.values,
+                       build_seconds=build_seconds,
+                       solve_seconds=solve_seconds,
+                       bound=min(bounds) if bounds else None)
+
+
+def _read_result(name, files, variables_count):
+    _, _, read_solution, _ = SOLVERS[name]
+
+    with open(files["log"], encoding="utf-8", errors="replace") as file:
+        log_text = file.read()
+
+    if os.path.exists(files["solution"]):
+        status, objective, values, bound = read_solution(files, log_text, variables_count)
+    else:
+        status, objective, values, bound = ("Not Solved", None,
+                                            np.zeros(variables_count), None)
+
+    return SolveResult(backend=name, status=status, objective=objective, values=values,
+                       build_seconds=0.0, solve_seconds=0.0, bound=bound)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from tables import Dataset
+    from parameters import ModelParameters
+    from model_builder import build_allocation_model
+
+    parser = argparse.ArgumentParser(
+        description="Resuelve el modelo con varios solucionadores a la vez y se "
+                    "queda con el primero que demuestra el óptimo o llega al gap."
+    )
+    parser.add_argument("--solvers", nargs="+", default=None, choices=list(SOLVERS))
+    parser.add_argument("--objective", default="fifo", choices=["count", "fifo"])
+    parser.add_argument("--time-limit", type=float, default=5)
+    parser.add_argument("--gap", type=float, default=0.0)
+    args = parser.parse_args()
+
+    allocation_model = build_allocation_model(ModelParameters(Dataset()), sale_excess=15,
+                                              objective=args.objective)
+
+    print("Solucionadores disponibles:", ", ".join(available_solvers(include_opt_in=True)))
+    print(solve_with_portfolio(allocation_model, solvers=args.solvers,
+                               time_limit=args.time_limit, target_gap=args.gap))
@@ -0,0 +1,252 @@
+import numpy as np
+
+from model_builder import SolveResult, Stopwatch, ROW_BATCH_UNIQUE, ROW_SYMMETRY
+
+# ## Presolve
+# `get_all_clients` y `get_all_products` unen los IDs de ventas y de stock,
+# así que el modelo arrastra clientes sin demanda, productos que nadie pidió
+# y lotes que nadie puede recibir. Antes de entregar el modelo al
+# solucionador:
+#
+#   1. Se eliminan los pares imposibles: V_b > D_cp + sale_excess (la
+#      columna no cabe en su fila de despacho). Con ellos desaparecen los
+#      clientes, productos y lotes que se quedan sin pares.
+#   2. Los lotes intercambiables (mismo producto, mismo volumen y los mismos
+#      clientes con el mismo coeficiente del objetivo) se agregan en una
+#      clase: una columna entera por cliente con cota = tamaño de la clase y
+#      la fila de unicidad con lado derecho = tamaño de la clase.
+#   3. Se eliminan las filas que no restringen (Σ coef⁺ · cota <= rhs).
+#
+# Los lotes que aparecen en filas de simetría (ver
+# `model_builder.symmetry_rows`) no se agregan: esas filas ya ordenan su
+# clase.
+#
+# `restore` desagrega la solución (los lotes de cada clase se reparten del
+# más antiguo al más nuevo), así que el plan informado y su objetivo son los
+# del modelo original.
+
+EPSILON = 1e-9
+
+
+class Presolve:
+    def __init__(self, model):
+        self.original = model
+        self.log = []
+
+        stopwatch = Stopwatch()
+
+        model, columns = self._drop_impossible_pairs(model)
+        model, columns, self.members = self._aggregate_batches(model, columns)
+        model = self._drop_redundant_rows(model)
+
+        # Columna original de cada columna reducida (la del lote representante).
+        self.columns = columns
+        self.model = model
+        self.seconds = stopwatch.lap()
+
+        self.log.append(f"Columnas: {self.original.variables_count} -> "
+                        f"{model.variables_count} | Filas: "
+                        f"{self.original.constraints_count} -> {model.constraints_count} "
+                        f"| {self.seconds:.3f} s")
+
+    def __str__(self):
+        return "\n".join(f"[presolve] {line}" for line in self.log)
+
+    # Valores del modelo original -> modelo reducido (por ejemplo, una
+    # solución inicial): cada columna agregada suma las de su clase.
+    def reduce(self, values):
+        values = np.asarray(values, dtype=float)
+        reduced = values[self.columns].copy()
+
+        for col, member_columns in self.members.items():
+            reduced[col] = values[member_columns].sum()
+
+        return reduced
+
+    # Valores del modelo reducido -> modelo original.
+    def restore(self, reduced_values):
+        values = np.zeros(self.original.variables_count)
+        values[self.columns] = reduced_values
+
+        # Las unidades de cada clase se entregan lote a lote; `taken` cuenta
+        # los lotes de la clase ya usados por otros clientes.
+        taken = {}
+
+        for col, member_columns in self.members.items():
+            units = int(round(reduced_values[col]))
+            batch_class = self.model.pair_batch[col]
+            first = taken.get(batch_class, 0)
+
+            values[member_columns] = 0.0
+            values[member_columns[first:first + units]] = 1.0
+            taken[batch_class] = first + units
+
+        return values
+
+    # ------------------------------------------------------------
+
+    def _drop_impossible_pairs(self, model):
+        # Solo las filas sin coeficientes negativos: en ellas un par que por sí
+        # solo supera el lado derecho nunca puede valer 1.
+        row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+        nonnegative_rows = np.bincount(row_of_entry, weights=model.data < 0,
+                                       minlength=model.constraints_count) == 0
+        too_large = (model.data > model.rhs[row_of_entry] + EPSILON) \
+            & nonnegative_rows[row_of_entry]
+
+        impossible = np.zeros(model.variables_count, dtype=bool)
+        impossible[model.indices[too_large]] = True
+        impossible |= model.upper <= 0
+
+        columns = np.flatnonzero(~impossible)
+        reduced = model.restrict(columns)
+
+        self.log.append(f"Pares imposibles (V_b > D_cp + sale_excess): "
+                        f"{int(impossible.sum())} de {model.variables_count}")
+
+        for name, entities, used in (
+            ("Clientes", model.clients, reduced.pair_client),
+            ("Productos", model.products, model.batch_product[reduced.pair_batch]
+             if model.batch_product is not None else None),
+            ("Lotes", model.batches, reduced.pair_batch),
+        ):
+            if used is not None:
+                self.log.append(f"{name} sin pares posibles: "
+                                f"{len(entities) - len(np.unique(used))} de {len(entities)}")
+
+        return reduced, columns
+
+    def _aggregate_batches(self, model, columns):
+        # Columnas de cada lote ordenadas por cliente.
+        order = np.lexsort((model.pair_client, model.pair_batch))
+        batches, starts = np.unique(model.pair_batch[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+
+        volume = model.batch_volume
+        product = model.batch_product
+
+        row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+        in_symmetry = np.zeros(model.variables_count, dtype=bool)
+        in_symmetry[model.indices[model.row_kind[row_of_entry] == ROW_SYMMETRY]] = True
+
+        classes = {}
+
+        for batch, start, end in zip(batches.tolist(), starts.tolist(), ends.tolist()):
+            batch_columns = order[start:end]
+
+            if in_symmetry[batch_columns].any():
+                continue
+
+            key = (None if product is None else int(product[batch]),
+                   None if volume is None else float(volume[batch]),
+                   model.pair_client[batch_columns].tobytes(),
+                   model.objective[batch_columns].tobytes(),
+                   model.upper[batch_columns].tobytes())
+            classes.setdefault(key, []).append((batch, batch_columns))
+
+        classes = [members for members in classes.values() if len(members) > 1]
+
+        if not classes:
+            self.log.append("Lotes agregados: 0")
+            return model, columns, {}
+
+        # Los lotes de cada clase, del más antiguo al más nuevo.
+        if model.batch_ship_date is not None:
+            classes = [sorted(members, key=lambda member: model.batch_ship_date[member[0]])
+                       for members in classes]
+
+        keep = np.ones(model.variables_count, dtype=bool)
+        upper = model.upper.copy()
+        unique_rhs = {}
+        class_columns = {}
+
+        for members in classes:
+            representative, representative_columns = members[0]
+            member_columns = np.stack([batch_columns for _, batch_columns in members], axis=1)
+
+            for batch, batch_columns in members[1:]:
+                keep[batch_columns] = False
+
+            upper[representative_columns] = model.upper[member_columns].sum(axis=1)
+            unique_rhs[representative] = len(members)
+
+            for col, row in zip(representative_columns.tolist(), member_columns):
+                class_columns[col] = row
+
+        kept = np.flatnonzero(keep)
+        new_index = np.full(model.variables_count, -1, dtype=np.int64)
+        new_index[kept] = np.arange(len(kept))
+
+        model.upper = upper
+        reduced = model.restrict(kept)
+
+        for row in np.flatnonzero(reduced.row_kind == ROW_BATCH_UNIQUE).tolist():
+            count = unique_rhs.get(int(reduced.row_entity[row]))
+
+            if count is not None:
+                reduced.rhs[row] *= count
+
+        members = {int(new_index[col]): columns[member_columns]
+                   for col, member_columns in class_columns.items()}
+
+        self.log.append(f"Lotes agregados: {sum(len(members) for members in classes)} "
+                        f"en {len(classes)} clases")
+
+        return reduced, columns[kept], members
+
+    def _drop_redundant_rows(self, model):
+        row_of_entry = np.repeat(np.arange(model.constraints_count), np.diff(model.indptr))
+        activity = np.bincount(row_of_entry,
+                               weights=np.clip(model.data, 0, None) * model.upper[model.indices],
+                               minlength=model.constraints_count)
+        binding = activity > model.rhs + EPSILON
+
+        keep = binding[row_of_entry]
+        indptr = np.zeros(int(binding.sum()) + 1, dtype=np.int64)
+        np.cumsum(np.diff(model.indptr)[binding], out=indptr[1:])
+
+        self.log.append(f"Filas que no restringen: "
+                        f"{model.constraints_count - int(binding.sum())} de "
+                        f"{model.constraints_count}")
+
+        model.row_kind = model.row_kind[binding]
+        model.row_entity = model.row_entity[binding]
+        model.indptr = indptr
+        model.indices = model.indices[keep]
+        model.data = model.data[keep]
+        model.rhs = model.rhs[binding]
+
+        return model
+
+
+# ------------------------------------------------------------
+
+# Resuelve el modelo reducido con `solve_model` y devuelve el resultado sobre
+# las columnas del modelo original.
+def solve_presolved(model, backend="cbc", initial_values=None, **options):
+    from model_backends import solve_model
+
+    presolve = Presolve(model)
+    print(presolve)
+
+    if initial_values is not None:
+        options["initial_values"] = presolve.reduce(initial_values)
+
+    if presolve.model.variables_count:
+        result = solve_model(presolve.model, backend, **options)
+        status, bound = result.status, result.bound
+        build_seconds, solve_seconds = result.build_seconds, result.solve_seconds
+        values = presolve.restore(result.values)
+
+    else:
+        status, bound = "Optimal", 0.0
+        build_seconds = solve_seconds = 0.0
+        values = np.zeros(model.variables_count)
+
+    return SolveResult(backend=f"{backend}/presolve",
+                       status=status,
+                       objective=float(model.objective @ values),
+                       values=values,
+                       build_seconds=presolve.seconds + build_seconds,
+                       solve_seconds=solve_seconds,
+                       bound=bound)
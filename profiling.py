@@ -0,0 +1,131 @@
+import json
+import os
+import platform
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+
+# ## Perfil de una corrida
+# Registra, por fase (carga de libros, parámetros, modelo, traducción al
+# solucionador, solucionador, extracción), el tiempo de reloj y el pico de
+# memoria de Python (tracemalloc), junto con el tamaño del modelo y el estado
+# y gap del solucionador. Se guarda como un JSON por corrida para comparar
+# corridas de distintos meses.
+#
+# tracemalloc hace más lento el código que mide, así que solo está activo
+# dentro de `phase` (si ya lo estaba antes, se deja como estaba). Lo que
+# corre fuera de las fases, como la traducción y el solucionador que `run`
+# registra con `add_phase`, se ejecuta sin él.
+#
+#   profile = RunProfile("model.pulp")
+#   with profile.phase("carga"):
+#       dataset = Dataset()
+#   ...
+#   run(model, "pulp", profile=profile)
+#   profile.write()
+
+PROFILES_DIR = "./profiles"
+
+
+class RunProfile:
+    def __init__(self, name, trace_memory=True):
+        self.name = name
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.trace_memory = trace_memory
+
+        self.phases = []
+        self.sizes = {}
+        self.model = None
+        self.solver = None
+
+    @contextmanager
+    def phase(self, name):
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+
+        if started_tracing:
+            tracemalloc.start()
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        start = perf_counter()
+
+        try:
+            yield
+
+        finally:
+            seconds = perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+
+            if started_tracing:
+                tracemalloc.stop()
+
+            self.add_phase(name, seconds, peak)
+
+    # Fase medida por fuera (por ejemplo, los tiempos de un `SolveResult`).
+    def add_phase(self, name, seconds, peak_bytes=None):
+        self.phases.append({
+            "phase": name,
+            "seconds": round(seconds, 6),
+            "peak_mb": None if peak_bytes is None else round(peak_bytes / 2 ** 20, 3),
+        })
+
+    # Tamaños de los conjuntos (clientes, lotes, productos, ...).
+    def record_sizes(self, **sizes):
+        self.sizes.update(sizes)
+
+    def record_model(self, model):
+        self.model = {
+            "variables": model.variables_count,
+            "constraints": model.constraints_count,
+            "nonzeros": model.nonzeros,
+        }
+
+    def record_result(self, result):
+        self.solver = {
+            "backend": result.backend,
+            "status": result.status,
+            "objective": result.objective,
+            "bound": result.bound,
+            "gap": result.gap,
+            "build_seconds": round(result.build_seconds, 6),
+            "solve_seconds": round(result.solve_seconds, 6),
+        }
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "python": platform.python_version(),
+            "total_seconds": round(sum(phase["seconds"] for phase in self.phases), 6),
+            "phases": self.phases,
+            "sizes": self.sizes,
+            "model": self.model,
+            "solver": self.solver,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    # Escribe el perfil en `directory` como <nombre>_<fecha y hora>.json.
+    def write(self, directory=PROFILES_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+        stamp = self.started_at.replace(":", "").replace("-", "")
+        path = os.path.join(directory, f"{self.name}_{stamp}.json")
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_json())
+
+        return path
+
+    def __str__(self):
+        lines = [f"Perfil {self.name}:"]
+
+        for phase in self.phases:
+            peak = "" if phase["peak_mb"] is None else f" | pico {phase['peak_mb']:.1f} MB"
+            lines.append(f"  {phase['phase']:<12} {phase['seconds']:>9.3f} s{peak}")
+
+        return "\n".join(lines)
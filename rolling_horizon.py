@@ -0,0 +1,195 @@
+import argparse
+import calendar
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from tables import Dataset
+from parameters import ModelParameters
+from excel_requests import get_demand_horizon
+from sweep import SharedParameters
+from model_builder import build_allocation_model, Stopwatch
+from model_backends import solve_model
+from heuristics import greedy_fifo_allocation
+
+
+# ## Horizonte rodante
+# Planifica varios meses de VENTAS.xlsx en una sola corrida. Cada ventana de
+# `window` meses es un único modelo en el que cada cliente se repite una vez
+# por mes (cliente virtual (c, m), con la demanda D_cpm del mes):
+#
+#   - un lote se asigna a lo sumo a un par cliente-mes;
+#   - solo puede salir en los meses que terminan después de su fecha nave;
+#   - el objetivo del mes m de la ventana se multiplica por
+#     month_discount ** m, para que los lotes más antiguos salgan primero.
+#
+# Se fija el primer mes de la ventana, sus lotes se retiran y la ventana
+# avanza un mes. La solución anterior (meses que se repiten) es la solución
+# inicial de la siguiente ventana. Con `time_limit` por ventana, la corrida
+# completa queda acotada por meses × time_limit.
+
+
+# Fin del mes "JAN 2024" (inicio del mes siguiente) en epoch UTC.
+def month_end_epoch(month):
+    start = datetime.strptime(month, "%b %Y")
+    carry, month_number = divmod(start.month, 12)
+
+    return calendar.timegm((start.year + carry, month_number + 1, 1, 0, 0, 0))
+
+
+# Demanda [cliente, producto, mes] alineada con los conjuntos de
+# `parameters`; los clientes y productos fuera de ellos se descartan.
+def aligned_demand(parameters, horizon, months):
+    rows = pd.Index(parameters.clients).get_indexer(horizon.clients)
+    columns = pd.Index(parameters.products).get_indexer(horizon.products)
+    month_positions = [horizon.months.index(month) for month in months]
+
+    keep_rows = rows >= 0
+    keep_columns = columns >= 0
+
+    demand = np.zeros((len(parameters.clients), len(parameters.products), len(months)))
+    demand[np.ix_(rows[keep_rows], columns[keep_columns])] = \
+        horizon.demand[np.ix_(keep_rows, keep_columns, month_positions)]
+
+    return demand
+
+
+# Modelo de una ventana: `demand` trae solo los meses de la ventana y
+# `available` marca los lotes que aún no se asignaron.
+def build_window_model(parameters, demand, available, months, sale_excess,
+                       objective, batch_egress_weight, month_discount):
+    clients_count = len(parameters.clients)
+    months_count = len(months)
+
+    clients = [f"{client}_{month.replace(' ', '')}"
+               for month in months for client in parameters.clients]
+
+    aptitude = np.concatenate([
+        parameters.aptitude.matrix
+        & (available & (parameters.ship_date_epoch < month_end_epoch(month)))
+        for month in months
+    ])
+
+    arrays = {
+        "priority": np.tile(parameters.priority, months_count),
+        "volume": parameters.volume,
+        "ship_date_epoch": parameters.ship_date_epoch,
+        "batch_product": parameters.batch_product,
+        "age_days": parameters.age_days,
+        "demand": demand.transpose(2, 0, 1).reshape(months_count * clients_count, -1),
+    }
+
+    window = SharedParameters(clients, parameters.batches, parameters.products,
+                              arrays, aptitude)
+
+    model = build_allocation_model(window, sale_excess, objective=objective,
+                                   batch_egress_weight=batch_egress_weight)
+    model.objective = model.objective * month_discount ** (model.pair_client // clients_count)
+
+    return model
+
+
+def plan_rolling_horizon(parameters, horizon, months=None, window=3, sale_excess=15,
+                         objective="fifo", batch_egress_weight=7, month_discount=0.9,
+                         backend="cbc", **options):
+    if months is None:
+        months = horizon.months
+
+    demand = aligned_demand(parameters, horizon, months)
+
+    clients_count = len(parameters.clients)
+    batches_count = len(parameters.batches)
+    available = np.ones(batches_count, dtype=bool)
+
+    previous_keys = pd.Index(np.empty(0, dtype=np.int64))
+    previous_values = np.empty(0)
+
+    plan = []
+    results = []
+
+    for start in range(len(months)):
+        stopwatch = Stopwatch()
+        stop = min(start + window, len(months))
+
+        model = build_window_model(parameters, demand[:, :, start:stop], available,
+                                   months[start:stop], sale_excess, objective,
+                                   batch_egress_weight, month_discount)
+
+        month_offset, client = np.divmod(model.pair_client, clients_count)
+        keys = ((start + month_offset) * clients_count + client) * batches_count \
+            + model.pair_batch
+
+        # Primera ventana: asignación FIFO golosa; las siguientes parten de la
+        # solución anterior en los meses que se repiten.
+        if start == 0:
+            initial_values = greedy_fifo_allocation(model)
+        else:
+            positions = previous_keys.get_indexer(keys)
+            initial_values = np.where(positions >= 0, previous_values[positions], 0.0)
+
+        if model.variables_count:
+            result = solve_model(model, backend, initial_values=initial_values, **options)
+            values = result.values
+            results.append(result)
+        else:
+            values = np.zeros(0)
+
+        committed = np.flatnonzero((values >= 0.5) & (month_offset == 0))
+        committed_batches = model.pair_batch[committed]
+        available[committed_batches] = False
+
+        plan.append(pd.DataFrame({
+            "month": months[start],
+            "client_id": np.asarray(parameters.clients)[client[committed]],
+            "batch_id": np.asarray(parameters.batches, dtype=object)[committed_batches],
+            "product_id": np.asarray(parameters.products, dtype=object)[
+                parameters.batch_product[committed_batches]],
+            "mass": parameters.volume[committed_batches],
+            "ship_date_epoch": parameters.ship_date_epoch[committed_batches],
+        }))
+
+        previous_keys = pd.Index(keys)
+        previous_values = values
+
+        status = results[-1].status if model.variables_count else "-"
+        print(f"[horizonte] {months[start]} (ventana {months[start]} .. "
+              f"{months[stop - 1]}): {len(committed)} lotes, "
+              f"{parameters.volume[committed_batches].sum():.0f} t | {status} | "
+              f"{stopwatch.lap():.2f} s")
+
+    return pd.concat(plan, ignore_index=True), results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Planifica varios meses de demanda con un horizonte rodante."
+    )
+    parser.add_argument("--start", default="JAN 2024", help="Primer mes a planificar.")
+    parser.add_argument("--months", type=int, default=3, help="Meses a planificar.")
+    parser.add_argument("--window", type=int, default=2, help="Meses por ventana.")
+    parser.add_argument("--sale-excess", type=float, default=15)
+    parser.add_argument("--objective", default="fifo", choices=["count", "fifo"])
+    parser.add_argument("--discount", type=float, default=0.9)
+    parser.add_argument("--backend", default="cbc")
+    parser.add_argument("--time-limit", type=float, default=5)
+    parser.add_argument("--output", default=None, help="CSV con el plan.")
+    args = parser.parse_args()
+
+    horizon = get_demand_horizon()
+    first = horizon.months.index(args.start)
+
+    plan, _ = plan_rolling_horizon(ModelParameters(Dataset()), horizon,
+                                   months=horizon.months[first:first + args.months],
+                                   window=args.window,
+                                   sale_excess=args.sale_excess,
+                                   objective=args.objective,
+                                   month_discount=args.discount,
+                                   backend=args.backend,
+                                   time_limit=args.time_limit)
+
+    print(plan.groupby("month", sort=False)["mass"].agg(["count", "sum"]).to_string())
+
+    if args.output:
+        plan.to_csv(args.output, index=False)
+        print(f"Plan en {args.output}")
@@ -0,0 +1,284 @@
+from time import time
+
+import numpy as np
+
+from tables import Dataset, get_raw_data
+from parameters import ModelParameters
+from model_builder import (build_allocation_model, objective_scales, SolveResult,
+                           Stopwatch, ROW_DISPATCH_LIMIT)
+from model_backends import solve_model
+from heuristics import greedy_fifo_allocation
+from decomposition import find_components
+
+
+# ## Sesión de planificación incremental
+# Mantiene en memoria el último modelo, su plan y los datos con que se armó.
+# Al recibir los libros editados compara los diccionarios de lotes, ventas y
+# prioridades con los anteriores y marca como sucias solo las columnas
+# afectadas: las de lotes nuevos o modificados, las de filas de despacho
+# (cliente, producto) cuya demanda cambió o que perdieron lotes, y las de
+# clientes cuya prioridad cambió. Las componentes conexas sin columnas sucias
+# son idénticas a las del modelo anterior, así que conservan su plan; el
+# resto se vuelve a resolver partiendo del plan anterior.
+#
+# Para que eso valga, los coeficientes del objetivo de una columna no pueden
+# depender de otros lotes o clientes: la fecha de referencia de T_b y las
+# constantes de normalización del objetivo fifo (mean(V), max(T), max(P), ver
+# `model_builder.objective_scales`) se fijan en `load` y se mantienen en cada
+# `update`. Aun así, toda columna cuyo coeficiente difiera del modelo anterior
+# se marca como sucia.
+#
+# Cada columna guarda el estado del solucionador que la resolvió por última
+# vez; el estado del plan es el más débil de todos ellos (ver
+# `weakest_status`), no el de la última sub-resolución.
+
+# Orden de los estados, del más fuerte al más débil: óptimo demostrado,
+# solución entera sin demostrar (detenido por tiempo o por gap) y sin
+# solución.
+def status_rank(status):
+    if status.startswith("Optimal"):
+        return 0
+
+    if status in ("Feasible", "Integer Feasible") or status.startswith("Stopped"):
+        return 1
+
+    return 2
+
+
+def weakest_status(statuses):
+    return max(statuses, key=status_rank, default="Optimal")
+
+
+def batch_signature(batch):
+    return (batch.center_name, batch.mill, batch.shipping_date_epoch,
+            batch.product_id, batch.mass,
+            frozenset(client for client, sellable in batch.sellable_clients.items()
+                      if sellable))
+
+
+# Demanda por (cliente, producto). Si hay filas repetidas gana la última,
+# igual que en `ModelParameters`.
+def demand_by_key(requests_data):
+    return {(request.client_id, request.product_id): float(request.requested)
+            for request in requests_data.values()}
+
+
+def importance_by_client(importance_data):
+    return {priority.client_id: priority.importance
+            for priority in importance_data.values()}
+
+
+def _changed_keys(previous, current):
+    return {key for key in previous.keys() | current.keys()
+            if previous.get(key) != current.get(key)}
+
+
+class DataDiff:
+    def __init__(self, previous_raw_data, raw_data):
+        previous_batches = {batch_id: batch_signature(batch)
+                            for batch_id, batch in previous_raw_data["batches"].items()}
+        batches = {batch_id: batch_signature(batch)
+                   for batch_id, batch in raw_data["batches"].items()}
+
+        self.added_batches = batches.keys() - previous_batches.keys()
+        self.removed_batches = previous_batches.keys() - batches.keys()
+        self.updated_batches = {batch_id for batch_id in batches.keys() & previous_batches.keys()
+                                if batches[batch_id] != previous_batches[batch_id]}
+
+        self.changed_demands = _changed_keys(demand_by_key(previous_raw_data["requests"]),
+                                             demand_by_key(raw_data["requests"]))
+        self.changed_priorities = _changed_keys(
+            importance_by_client(previous_raw_data["importance"]),
+            importance_by_client(raw_data["importance"])
+        )
+
+    def __bool__(self):
+        return bool(self.added_batches or self.removed_batches or self.updated_batches
+                    or self.changed_demands or self.changed_priorities)
+
+    def __str__(self):
+        return (f"Lotes: +{len(self.added_batches)} -{len(self.removed_batches)} "
+                f"~{len(self.updated_batches)} | "
+                f"Demandas modificadas: {len(self.changed_demands)} | "
+                f"Prioridades modificadas: {len(self.changed_priorities)}")
+
+
+# ------------------------------------------------------------
+
+# Claves (cliente, lote) y (cliente, producto) de las columnas del modelo.
+def pair_keys(model):
+    clients = np.asarray(model.clients, dtype=object)
+    batches = np.asarray(model.batches, dtype=object)
+
+    return list(zip(clients[model.pair_client].tolist(),
+                    batches[model.pair_batch].tolist()))
+
+
+def dispatch_row_keys(model):
+    rows = np.flatnonzero(model.row_kind == ROW_DISPATCH_LIMIT)
+    clients, products = np.divmod(model.row_entity[rows], len(model.products))
+
+    return rows, list(zip(np.asarray(model.clients, dtype=object)[clients].tolist(),
+                          np.asarray(model.products, dtype=object)[products].tolist()))
+
+
+class PlanningSession:
+    def __init__(self, sale_excess=15, backend="cbc", objective="count",
+                 batch_egress_weight=7, **options):
+        self.sale_excess = sale_excess
+        self.objective = objective
+        self.batch_egress_weight = batch_egress_weight
+        self.backend = backend
+        self.options = options
+
+        # La antigüedad T_b se mide siempre desde el inicio de la sesión y las
+        # escalas del objetivo se fijan en la carga inicial; si no, el cambio
+        # de día o un lote nuevo más antiguo alterarían el objetivo de todas
+        # las componentes.
+        self.now = time()
+        self.scales = None
+
+        self.raw_data = None
+        self.model = None
+        self.result = None
+        self.plan_keys = []
+        self.plan = {}
+        self.statuses = {}
+
+    # Arma y resuelve el modelo completo (la primera carga del día).
+    def load(self, raw_data=None):
+        if raw_data is None:
+            raw_data = get_raw_data()
+
+        stopwatch = Stopwatch()
+
+        self.scales = None
+        model = self._build(raw_data)
+        dirty = np.arange(model.variables_count)
+
+        return self._solve(raw_data, model, dirty, greedy_fifo_allocation(model),
+                           stopwatch)
+
+    # Aplica los libros editados y vuelve a resolver solo lo afectado.
+    def update(self, raw_data=None):
+        if self.model is None:
+            return self.load(raw_data)
+
+        if raw_data is None:
+            raw_data = get_raw_data()
+
+        stopwatch = Stopwatch()
+
+        diff = DataDiff(self.raw_data, raw_data)
+        model = self._build(raw_data) if diff else self.model
+        keys = pair_keys(model)
+
+        # Plan anterior como solución inicial; los pares nuevos parten en 0.
+        initial_values = np.array([self.plan.get(key, 0.0) for key in keys])
+
+        dirty_batches = diff.added_batches | diff.updated_batches
+        dirty_clients = diff.changed_priorities
+
+        # Filas de despacho que cambian: demanda distinta o lotes que salen.
+        dirty_dispatch = set(diff.changed_demands)
+        previous_batch_product = {batch_id: batch.product_id
+                                  for batch_id, batch in self.raw_data["batches"].items()}
+
+        for client, batch in self.plan_keys:
+            if batch in diff.removed_batches or batch in diff.updated_batches:
+                dirty_dispatch.add((client, previous_batch_product[batch]))
+
+        dirty_mask = np.array([client in dirty_clients or batch in dirty_batches
+                               for client, batch in keys], dtype=bool)
+
+        # Columnas nuevas o cuyo coeficiente del objetivo cambió: el plan
+        # anterior de su componente ya no está demostrado óptimo.
+        previous_objective = dict(zip(self.plan_keys, self.model.objective.tolist()))
+        dirty_mask |= np.array([previous_objective.get(key) != coefficient
+                                for key, coefficient in zip(keys, model.objective.tolist())],
+                               dtype=bool)
+
+        rows, row_keys = dispatch_row_keys(model)
+
+        for row, key in zip(rows.tolist(), row_keys):
+            if key in dirty_dispatch:
+                dirty_mask[model.row(row)[0]] = True
+
+        # Se re-resuelven las componentes completas que tocan algo sucio.
+        labels = find_components(model)
+        dirty = np.flatnonzero(np.isin(labels, np.unique(labels[dirty_mask])))
+
+        print(f"[sesión] {diff}")
+
+        return self._solve(raw_data, model, dirty, initial_values, stopwatch)
+
+    # Plan vigente como pares (client_id, batch_id) asignados.
+    def assigned_pairs(self):
+        return self.model.assigned_pairs(self.result.values)
+
+    # ------------------------------------------------------------
+
+    def _build(self, raw_data):
+        parameters = ModelParameters(Dataset(raw_data), now=self.now)
+
+        if self.scales is None:
+            self.scales = objective_scales(parameters)
+
+        return build_allocation_model(parameters,
+                                      self.sale_excess,
+                                      objective=self.objective,
+                                      batch_egress_weight=self.batch_egress_weight,
+                                      scales=self.scales)
+
+    def _solve(self, raw_data, model, dirty, initial_values, stopwatch):
+        values = initial_values.astype(float)
+        keys = pair_keys(model)
+
+        # Las columnas que se conservan mantienen el estado con que se
+        # resolvieron; una columna sin estado previo no está resuelta.
+        statuses = [self.statuses.get(key, "Not Solved") for key in keys]
+
+        build_seconds = stopwatch.lap()
+
+        if len(dirty):
+            submodel = model.restrict(dirty)
+            result = solve_model(submodel, self.backend,
+                                 initial_values=initial_values[dirty], **self.options)
+
+            values[dirty] = result.values
+
+            for col in dirty.tolist():
+                statuses[col] = result.status
+
+        print(f"[sesión] Columnas re-resueltas: {len(dirty)} de {model.variables_count}")
+
+        self.raw_data = raw_data
+        self.model = model
+        self.plan_keys = keys
+        self.plan = {key: value
+                     for key, value in zip(self.plan_keys, values.tolist()) if value}
+        self.statuses = dict(zip(keys, statuses))
+        self.result = SolveResult(backend=f"{self.backend}/sesión",
+                                  status=weakest_status(statuses),
+                                  objective=float(model.objective @ values),
+                                  values=values,
+                                  build_seconds=build_seconds,
+                                  solve_seconds=stopwatch.lap())
+
+        return self.result
+
+
+if __name__ == "__main__":
+    # Carga inicial y, después, una actualización por cada Enter: los libros
+    # editados se vuelven a leer (el caché detecta los archivos modificados).
+    session = PlanningSession(time_limit=5)
+    print(session.load())
+
+    try:
+        while True:
+            input("Enter para releer los libros (Ctrl+C para salir)... ")
+            print(session.update())
+            print("Total de lotes asignados:", len(session.assigned_pairs()))
+
+    except (KeyboardInterrupt, EOFError):
+        pass
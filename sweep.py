@@ -0,0 +1,158 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from tables import Dataset
+from parameters import ModelParameters
+from compatibility import CompatibilityMatrix
+from model_builder import build_allocation_model
+from model_backends import solve_model
+
+
+# ## Barrido de escenarios
+# Los libros se leen y los parámetros se calculan una sola vez. Los arreglos
+# de `ModelParameters` se copian a memoria compartida y cada proceso del grupo
+# los adjunta al iniciar (sin serializar DataFrames); luego cada proceso arma
+# y resuelve el modelo de cada combinación (sale_excess, batch_egress_weight).
+
+SHARED_ARRAYS = ("priority", "volume", "ship_date_epoch", "batch_product",
+                 "age_days", "demand")
+
+
+# Parámetros armados sobre arreglos ya calculados (los que comparte el
+# barrido); expone los mismos atributos que usa `build_allocation_model`.
+class SharedParameters:
+    def __init__(self, clients, batches, products, arrays, aptitude):
+        self.clients = clients
+        self.batches = batches
+        self.products = products
+
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+        self.aptitude = CompatibilityMatrix(clients, batches, aptitude)
+
+
+# Copia `arrays` a bloques de memoria compartida. Devuelve los bloques (hay
+# que cerrarlos y liberarlos) y la descripción para adjuntarlos.
+def share_arrays(arrays):
+    blocks = []
+    spec = {}
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+
+    return blocks, spec
+
+
+def attach_arrays(spec):
+    blocks = []
+    arrays = {}
+
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    return blocks, arrays
+
+
+# ------------------------------------------------------------
+
+# Estado de cada proceso: bloques adjuntos y parámetros armados sobre ellos.
+_worker = {}
+
+
+def _init_worker(clients, batches, products, spec):
+    blocks, arrays = attach_arrays(spec)
+    aptitude = arrays.pop("aptitude")
+
+    _worker["blocks"] = blocks
+    _worker["parameters"] = SharedParameters(clients, batches, products, arrays, aptitude)
+
+
+def _solve_scenario(args):
+    sale_excess, batch_egress_weight, objective, backend, options = args
+    parameters = _worker["parameters"]
+
+    model = build_allocation_model(parameters, sale_excess, objective=objective,
+                                   batch_egress_weight=batch_egress_weight)
+    result = solve_model(model, backend, **options)
+
+    assigned = np.flatnonzero(result.values >= 0.5)
+    assigned_batches = model.pair_batch[assigned]
+    assigned_ages = parameters.age_days[assigned_batches]
+
+    return {
+        "sale_excess": sale_excess,
+        "batch_egress_weight": batch_egress_weight,
+        "status": result.status,
+        "objective": result.objective,
+        "assigned_batches": len(assigned),
+        "assigned_mass": float(parameters.volume[assigned_batches].sum()),
+        "assigned_mean_age_days": float(assigned_ages.mean()) if len(assigned) else 0.0,
+        "variables": model.variables_count,
+        "build_seconds": round(result.build_seconds, 3),
+        "solve_seconds": round(result.solve_seconds, 3),
+    }
+
+
+def run_sweep(parameters, sale_excess_values, batch_egress_weights,
+              objective="fifo", backend="cbc", max_workers=None, **options):
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    arrays = {name: getattr(parameters, name) for name in SHARED_ARRAYS}
+    arrays["aptitude"] = parameters.aptitude.matrix
+
+    blocks, spec = share_arrays(arrays)
+    init_args = (parameters.clients, parameters.batches, parameters.products, spec)
+    tasks = [(sale_excess, weight, objective, backend, options)
+             for sale_excess, weight in product(sale_excess_values, batch_egress_weights)]
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=init_args) as executor:
+            rows = list(executor.map(_solve_scenario, tasks))
+
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Resuelve una grilla de escenarios (sale_excess × "
+                    "batch_egress_weight) en paralelo y escribe una tabla CSV."
+    )
+    parser.add_argument("--sale-excess", type=float, nargs="+",
+                        default=[0, 5, 10, 15, 20, 30, 40, 60, 80, 100])
+    parser.add_argument("--weights", type=float, nargs="+", default=[1, 3, 5, 7, 9])
+    parser.add_argument("--objective", default="fifo", choices=["count", "fifo"])
+    parser.add_argument("--backend", default="cbc")
+    parser.add_argument("--time-limit", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+
+    results = run_sweep(ModelParameters(Dataset()), args.sale_excess, args.weights,
+                        objective=args.objective, backend=args.backend,
+                        max_workers=args.workers,
+                        time_limit=args.time_limit)
+
+    results.to_csv(args.output, index=False)
+    print(results.to_string(index=False))
+    print(f"Resultados en {args.output}")
@@ -0,0 +1,162 @@
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from excel_batches import Batch
+from excel_requests import Request
+from excel_priority import Priority
+
+
+# Datos sintéticos con la misma forma que `tables.get_raw_data()`, para medir
+# cómo escalan los modelos sin depender de los libros reales. Con
+# `mass_range=(m, m)` todos los lotes pesan lo mismo (lotes estándar).
+def synthetic_raw_data(batches_count, clients_count=100, products_count=10,
+                       locations_count=4, aptitude_rate=0.3, seed=0,
+                       mass_range=(10, 600)):
+    rng = np.random.default_rng(seed)
+
+    clients = [18000 + client for client in range(clients_count)]
+    products = [f"CC{3000 + 100 * product + 29}" for product in range(products_count)]
+    locations = [f"Pulp Port {location}" for location in range(locations_count)]
+    mills = ["Santa Fe", "Pacifico", "Guaiba"]
+
+    batch_products = rng.integers(0, products_count, batches_count).tolist()
+    batch_mills = rng.integers(0, len(mills), batches_count).tolist()
+    shipping_dates = (1_680_000_000
+                      + 86_400 * rng.integers(0, 365, batches_count)).tolist()
+    masses = rng.uniform(*mass_range, batches_count).round(3).tolist()
+    aptitude = (rng.random((batches_count, clients_count)) < aptitude_rate).tolist()
+
+    batches = {}
+
+    for batch in range(batches_count):
+        batch_id = f"{551000 + batch}"
+        batches[batch_id] = Batch.from_parsed(
+            center_name=locations[batch % locations_count],
+            mill=mills[batch_mills[batch]],
+            shipping_date_epoch=shipping_dates[batch],
+            batch_id=batch_id,
+            product_id=products[batch_products[batch]],
+            mass=masses[batch],
+            sellable_clients=zip(clients, aptitude[batch])
+        )
+
+    # Cada cliente pide entre uno y tres productos (a lo sumo todos los que hay).
+    requests = {}
+    max_requested_products = min(3, len(products))
+
+    for client in clients:
+        for product in rng.choice(products, size=rng.integers(1, max_requested_products + 1),
+                                  replace=False).tolist():
+            requests[len(requests)] = Request(
+                client_description=f"Cliente {client}",
+                client_id=client,
+                client_group_description=f"Grupo {client % 10}",
+                location=locations[client % locations_count],
+                product_id=product,
+                requested=float(rng.integers(1, 40) * 100)
+            )
+
+    importance = {
+        index: Priority(client_id=client, priority=float(rng.choice([1, 5, 10])))
+        for index, client in enumerate(clients)
+    }
+
+    return {"batches": batches,
+            "requests": requests,
+            "importance": importance}
+
+
+# ------------------------------------------------------------
+
+# ## Libros sintéticos
+# Los mismos datos en el formato de columnas de STOCK.xlsx, VENTAS.xlsx y
+# PRIORIDADES.xlsx, para medir también la lectura de los libros. Leídos con
+# los cargadores de `excel_*.py` devuelven los mismos lotes, ventas y
+# prioridades que `raw_data`.
+
+STOCK_COLUMNS = ["Nombre Centro", "Planta", "Nave", "Fecha Nave", "Lote", "Material",
+                 "Fardos Arrib (LU)", "Net Arrib (LU)", "KG Brut Arrib (LU)",
+                 "Fardos en tráns", "Net en Tráns", "KG Brut en tráns"]
+
+SALES_COLUMNS = ["Descripción de cliente 2", "ID de cliente CMPC", "País/región del cliente",
+                 "Descripción del grupo de cliente", "Ubicación", "Tipo de Fibra", "Linea",
+                 "ID de producto", " ", "VENTAS_PROGRAMA"]
+
+SALES_MONTHS = ["DEC 2023", "JAN 2024", "FEB 2024", "MAR 2024", "APR 2024", "MAY 2024",
+                "JUN 2024", "JUL 2024", "AUG 2024", "SEP 2024", "OCT 2024", "NOV 2024",
+                "DEC 2024"]
+
+
+# Hoja "Format": fila de títulos (nombre del cliente sobre cada columna de
+# cliente), encabezado y una fila por lote. La celda de un cliente apto lleva
+# la masa del lote y la de uno no apto queda vacía.
+def stock_rows(raw_data):
+    batches = list(raw_data["batches"].values())
+    clients = list(batches[0].sellable_clients.keys()) if batches else []
+
+    yield [None] * len(STOCK_COLUMNS) + [f"Cliente {client}" for client in clients]
+    yield STOCK_COLUMNS + clients
+
+    for batch in batches:
+        shipping_date = datetime.fromtimestamp(batch.shipping_date_epoch, timezone.utc)
+
+        yield [batch.center_name.upper(), batch.mill.upper(), "STAR SINTETICO",
+               shipping_date.replace(tzinfo=None), batch.batch_id, batch.product_id,
+               round(batch.mass * 4), batch.mass, round(batch.mass * 1000),
+               0, 0.0, 0] + [batch.mass if batch.sellable_clients[client] else None
+                             for client in clients]
+
+
+# Hoja "Ventas": el mes "JAN 2024" es la demanda de `raw_data`; los demás
+# meses varían alrededor de ella.
+def sales_rows(raw_data, seed=0):
+    rng = np.random.default_rng(seed)
+
+    yield SALES_COLUMNS + SALES_MONTHS
+
+    for request in raw_data["requests"].values():
+        months = (request.requested
+                  * rng.uniform(0.5, 1.5, len(SALES_MONTHS))).round(-2).tolist()
+        months[SALES_MONTHS.index("JAN 2024")] = request.requested
+
+        yield [request.client_description.upper(), request.client_id, "ALEMANIA",
+               request.client_group_description.upper(), request.location.upper(),
+               "Fibra Corta", "Linea 1", request.product_id, "Volumen de venta CS",
+               request.requested] + months
+
+
+def priority_rows(raw_data):
+    yield ["client_id", "importance"]
+
+    for priority in raw_data["importance"].values():
+        yield [priority.client_id, priority.importance]
+
+
+def _write_workbook(path, sheet_name, rows):
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(path)
+
+
+# Escribe los tres libros en `directory`; devuelve sus rutas con las claves de
+# `get_raw_data()`.
+def write_synthetic_workbooks(raw_data, directory, seed=0):
+    os.makedirs(directory, exist_ok=True)
+
+    paths = {"batches": os.path.join(directory, "STOCK.xlsx"),
+             "requests": os.path.join(directory, "VENTAS.xlsx"),
+             "importance": os.path.join(directory, "PRIORIDADES.xlsx")}
+
+    _write_workbook(paths["batches"], "Format", stock_rows(raw_data))
+    _write_workbook(paths["requests"], "Ventas", sales_rows(raw_data, seed))
+    _write_workbook(paths["importance"], "Hoja1", priority_rows(raw_data))
+
+    return paths
@@ -1,15 +1,72 @@
+import numpy
 import pandas
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 
 from excel_batches import get_batches_from_stocks
 from excel_requests import get_sales_data
 from excel_priority import get_client_priority_data
+from compatibility import CompatibilityMatrix
+from excel_cache import (CODECS, evict, fingerprint_files,
+                         get_cached_batches_from_stocks,
+                         get_cached_sales_data,
+                         get_cached_client_priority_data)
 
 
-def get_raw_data():
-    return {"batches": get_batches_from_stocks(),
-            "requests": get_sales_data(),
-            "importance": get_client_priority_data()}
+LOADERS = {"batches": get_batches_from_stocks,
+           "requests": get_sales_data,
+           "importance": get_client_priority_data}
+
+CACHED_LOADERS = {"batches": get_cached_batches_from_stocks,
+                  "requests": get_cached_sales_data,
+                  "importance": get_cached_client_priority_data}
+
+DEFAULT_PATHS = {"batches": "./STOCK.xlsx",
+                 "requests": "./VENTAS.xlsx",
+                 "importance": "./PRIORIDADES.xlsx"}
+
+
+def _load(kind, path, use_cache, evict_entries=True):
+    if use_cache:
+        return CACHED_LOADERS[kind](path, evict_entries=evict_entries)
+
+    return LOADERS[kind](path)
+
+
+# Se ejecuta en otro proceso: devuelve los datos ya codificados como arreglos
+# (ver `excel_cache.CODECS`), que se serializan mucho más rápido que los
+# objetos.
+def _load_encoded(args):
+    kind, path, use_cache = args
+    encode, _ = CODECS[kind]
+    return encode(_load(kind, path, use_cache, evict_entries=False))
+
+
+# `paths` reemplaza la ruta de alguno de los libros ({"batches": ...,
+# "requests": ..., "importance": ...}). Con `parallel=True` los tres libros se
+# leen a la vez en un grupo de procesos (openpyxl ocupa la CPU), así que el
+# tiempo queda acotado por el libro más grande (STOCK.xlsx). El índice del
+# caché solo lo escribe el proceso principal: las huellas se calculan antes
+# de repartir los libros y la política de tamaño se aplica al final.
+def get_raw_data(use_cache: bool = True, parallel: bool = False, paths: dict = None):
+    paths = {**DEFAULT_PATHS, **(paths or {})}
+
+    if not parallel:
+        return {kind: _load(kind, paths[kind], use_cache) for kind in LOADERS}
+
+    if use_cache:
+        fingerprint_files(paths[kind] for kind in LOADERS)
+
+    tasks = [(kind, paths[kind], use_cache) for kind in LOADERS]
+
+    with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+        encoded = list(executor.map(_load_encoded, tasks))
+
+    if use_cache:
+        evict()
+
+    return {kind: CODECS[kind][1](arrays) for kind, arrays in zip(LOADERS, encoded)}
 
 # ------------------------------------------------------------
 
@@ -20,8 +77,7 @@ def get_all_clients(batches_data, requests_data):
 
     # Clientes de la tabla de stocks
     for entry in batches_data:
-        for client in batches_data[entry].sellable_clients.keys():
-            clients.add(client)
+        clients.update(batches_data[entry].sellable_clients.keys())
 
     clients = list(clients)
     clients.sort()
@@ -64,6 +120,19 @@ def get_all_batches(batches_data):
 
     return batches
 
+
+# Índice de lotes por producto: {product_id: [batch_id, ...]}
+def get_batches_by_product(batches_data, batches=None):
+    if batches is None:
+        batches = get_all_batches(batches_data)
+
+    batches_by_product = defaultdict(list)
+
+    for batch in batches:
+        batches_by_product[batches_data[batch].product_id].append(batch)
+
+    return batches_by_product
+
 # ------------------------------------------------------------
 
 # ## Tabla de ventas
@@ -131,8 +200,9 @@ def get_clients_locations_table(requests_data):
 # | 18820      | KOEHLER                          | KOEHL OBERK             |
 # | 18375      | SAPPI                            | SAPPI ALF               |
 # | ...        | ...                              | ...                     |
-def get_clients_data_table(batches_data, requests_data):
-    clients = get_all_clients(batches_data, requests_data)
+def get_clients_data_table(batches_data, requests_data, clients=None):
+    if clients is None:
+        clients = get_all_clients(batches_data, requests_data)
 
     clients_data = dict()
 
@@ -165,8 +235,10 @@ def get_clients_data_table(batches_data, requests_data):
 # | 18820      | 10                                          |
 # | 18375      | 1                                           |
 # | ...        | ...                                         |
-def get_clients_priorities_table(batches_data, request_data, importance_data):
-    clients = get_all_clients(batches_data, request_data)
+def get_clients_priorities_table(batches_data, request_data, importance_data, clients=None):
+    if clients is None:
+        clients = get_all_clients(batches_data, request_data)
+
     data = defaultdict(lambda: 0.0)
 
     for index in importance_data.keys():
@@ -192,8 +264,9 @@ def get_clients_priorities_table(batches_data, request_data, importance_data):
 # | 1689120001         | 551375B  | CC4929     | 47.856                        |
 # | 1689120001         | 551383B  | CC3029     | 40.04                         |
 # | ...                | ...      | ...        | ...                           |
-def get_batches_volumes_table(batches_data):
-    batches = get_all_batches(batches_data)
+def get_batches_volumes_table(batches_data, batches=None):
+    if batches is None:
+        batches = get_all_batches(batches_data)
 
     batches_volumes = pandas.DataFrame({
         "batch_id": batches,
@@ -218,8 +291,9 @@ def get_batches_volumes_table(batches_data):
 # | Pulp Monfalcone | 551375B  |
 # | Pulp Flushing   | 551383B  |
 # | ...             | ...      |
-def get_batches_locations_table(batches_data):
-    batches = get_all_batches(batches_data)
+def get_batches_locations_table(batches_data, batches=None):
+    if batches is None:
+        batches = get_all_batches(batches_data)
 
     batches_volumes = pandas.DataFrame({
         "batch_id": batches,
@@ -254,67 +328,143 @@ def get_batches_locations_table(batches_data):
 # | 18820      | 551383B  | 1                                 |
 # | 18375      | 551383B  | 1                                 |
 # | ...        | ...      | ...                               |
-def get_compatibility_client_batch_table(batches_data, requests_data):
-    batches = get_all_batches(batches_data)
-    clients = get_all_clients(batches_data, requests_data)
-
-    compatibility_dict = dict()
-
-    for batch in batches:
-        for client in clients:
-            compatibility_dict[(client, batch)] = 0
-
-    for batch in batches_data:
-        for client in batches_data[batch].sellable_clients.keys():
-            if batches_data[batch].sellable_clients[client]:
-                compatibility_dict[(client, batch)] = 1
+def get_compatibility_client_batch_table(batches_data, requests_data,
+                                         clients=None, batches=None,
+                                         compatibility_matrix=None):
+    if compatibility_matrix is None:
+        compatibility_matrix = get_compatibility_matrix(batches_data, requests_data,
+                                                        clients, batches)
 
-            else:
-                compatibility_dict[(client, batch)] = 0
+    clients = compatibility_matrix.clients
+    batches = compatibility_matrix.batches
 
     compatibility_table = pandas.DataFrame({
-        "client_id": [client for client, batch in compatibility_dict.keys()],
-        "batch_id": [batch for client, batch in compatibility_dict.keys()],
-        "apt": [compatibility_dict[key] for key in compatibility_dict.keys()]
+        "client_id": numpy.tile(numpy.asarray(clients), len(batches)),
+        "batch_id": numpy.repeat(numpy.asarray(batches, dtype=object), len(clients)),
+        "apt": compatibility_matrix.matrix.T.ravel().astype(int)
     })
 
     return compatibility_table
 
 
+# ------------------------------------------------------------
+
+# ## Matriz de aptitud cliente × lote (ver `compatibility.CompatibilityMatrix`)
+def get_compatibility_matrix(batches_data, requests_data, clients=None, batches=None):
+    if batches is None:
+        batches = get_all_batches(batches_data)
+
+    if clients is None:
+        clients = get_all_clients(batches_data, requests_data)
+
+    return CompatibilityMatrix.from_batches_data(batches_data, clients, batches)
+
+
+# ------------------------------------------------------------
+
+# Datos de una corrida: los libros se leen una sola vez y cada conjunto o
+# tabla se calcula (y ordena) solo la primera vez que se pide.
+class Dataset:
+    # Sin `raw_data` se leen los libros con `get_raw_data(use_cache, parallel)`.
+    def __init__(self, raw_data=None, use_cache=True, parallel=False):
+        if raw_data is None:
+            raw_data = get_raw_data(use_cache=use_cache, parallel=parallel)
+
+        self.batches_data = raw_data["batches"]
+        self.requests_data = raw_data["requests"]
+        self.importance_data = raw_data["importance"]
+
+    # Conjuntos
+
+    @cached_property
+    def clients(self):
+        return get_all_clients(self.batches_data, self.requests_data)
+
+    @cached_property
+    def locations(self):
+        return get_all_locations(self.batches_data, self.requests_data)
+
+    @cached_property
+    def products(self):
+        return get_all_products(self.batches_data, self.requests_data)
+
+    @cached_property
+    def batches(self):
+        return get_all_batches(self.batches_data)
+
+    @cached_property
+    def batches_by_product(self):
+        return get_batches_by_product(self.batches_data, self.batches)
+
+    # Tablas
+
+    @cached_property
+    def sales_table(self):
+        return get_sales_table(self.requests_data)
+
+    @cached_property
+    def clients_locations_table(self):
+        return get_clients_locations_table(self.requests_data)
+
+    @cached_property
+    def clients_data_table(self):
+        return get_clients_data_table(self.batches_data, self.requests_data,
+                                      self.clients)
+
+    @cached_property
+    def clients_priorities_table(self):
+        return get_clients_priorities_table(self.batches_data, self.requests_data,
+                                            self.importance_data, self.clients)
+
+    @cached_property
+    def batches_volumes_table(self):
+        return get_batches_volumes_table(self.batches_data, self.batches)
+
+    @cached_property
+    def batches_locations_table(self):
+        return get_batches_locations_table(self.batches_data, self.batches)
+
+    @cached_property
+    def compatibility_matrix(self):
+        return get_compatibility_matrix(self.batches_data, self.requests_data,
+                                        self.clients, self.batches)
+
+    @cached_property
+    def compatibility_table(self):
+        return get_compatibility_client_batch_table(
+            self.batches_data, self.requests_data,
+            compatibility_matrix=self.compatibility_matrix
+        )
+
+
 if __name__ == "__main__":
-    (request_data_dict,
-     batches_data_dict,
-     importance_data_dict) = (get_raw_data()["requests"],
-                              get_raw_data()["batches"],
-                              get_raw_data()["importance"])
+    dataset = Dataset()
 
-    print("Clients", get_all_clients(batches_data_dict, request_data_dict))
-    print("Locations", get_all_locations(batches_data_dict, request_data_dict))
-    print("Products", get_all_products(batches_data_dict, request_data_dict))
-    print("Batches", get_all_batches(batches_data_dict))
+    print("Clients", dataset.clients)
+    print("Locations", dataset.locations)
+    print("Products", dataset.products)
+    print("Batches", dataset.batches)
 
     print()
     print()
 
-    print(get_sales_table(request_data_dict))
+    print(dataset.sales_table)
     print()
 
-    print(get_clients_locations_table(request_data_dict))
+    print(dataset.clients_locations_table)
     print()
 
-    print(get_clients_data_table(batches_data_dict, request_data_dict))
+    print(dataset.clients_data_table)
     print()
 
-    print(get_clients_priorities_table(batches_data_dict, request_data_dict, importance_data_dict))
+    print(dataset.clients_priorities_table)
     print()
 
-    print(get_batches_volumes_table(batches_data_dict))
+    print(dataset.batches_volumes_table)
     print()
 
-    print(get_batches_locations_table(batches_data_dict))
+    print(dataset.batches_locations_table)
     print()
 
-    print(get_compatibility_client_batch_table(batches_data_dict, request_data_dict))
+    print(dataset.compatibility_table)
     print()
-
-
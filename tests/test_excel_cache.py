@@ -0,0 +1,57 @@
+import glob
+import os
+
+import numpy as np
+
+import excel_cache
+from excel_cache import cached_load
+
+
+def counting_loader(calls):
+    def loader(file_path):
+        calls.append(file_path)
+        return {"values": np.arange(3)}
+
+    return loader
+
+
+def load(source, cache_dir, calls):
+    return cached_load("test", str(source), counting_loader(calls),
+                       encode=lambda data: data,
+                       decode=lambda arrays: {"values": arrays["values"]},
+                       cache_dir=str(cache_dir))
+
+
+def test_truncated_entry_is_reparsed(tmp_path):
+    source = tmp_path / "libro.xlsx"
+    source.write_bytes(b"contenido")
+    cache_dir = tmp_path / "cache"
+    calls = []
+
+    load(source, cache_dir, calls)
+    [entry] = glob.glob(os.path.join(cache_dir, "*.npz"))
+
+    with open(entry, "r+b") as file:
+        file.truncate(os.path.getsize(entry) // 2)
+
+    data = load(source, cache_dir, calls)
+
+    assert len(calls) == 2
+    assert data["values"].tolist() == [0, 1, 2]
+
+
+def test_cache_version_is_part_of_the_key(tmp_path, monkeypatch):
+    source = tmp_path / "libro.xlsx"
+    source.write_bytes(b"contenido")
+    cache_dir = tmp_path / "cache"
+    calls = []
+
+    load(source, cache_dir, calls)
+    load(source, cache_dir, calls)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(excel_cache, "CACHE_VERSION", excel_cache.CACHE_VERSION + 1)
+    load(source, cache_dir, calls)
+
+    assert len(calls) == 2
+    assert len(glob.glob(os.path.join(cache_dir, "*.npz"))) == 2
@@ -0,0 +1,37 @@
+import numpy as np
+import openpyxl
+
+from excel_requests import get_demand_horizon
+from synthetic_data import SALES_COLUMNS, SALES_MONTHS, sales_rows, synthetic_raw_data
+
+
+def write_sales(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Ventas"
+
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(path)
+
+
+def test_demand_horizon_skips_rows_without_client(tmp_path):
+    rows = list(sales_rows(synthetic_raw_data(20, 5, products_count=2)))
+
+    blank = [None] * len(rows[0])
+    total = ["TOTAL"] + [None] * (len(SALES_COLUMNS) - 1) + [
+        sum(row[len(SALES_COLUMNS) + month] for row in rows[1:])
+        for month in range(len(SALES_MONTHS))
+    ]
+
+    write_sales(tmp_path / "clean.xlsx", rows)
+    write_sales(tmp_path / "totals.xlsx", rows + [blank, total])
+
+    expected = get_demand_horizon(str(tmp_path / "clean.xlsx"))
+    horizon = get_demand_horizon(str(tmp_path / "totals.xlsx"))
+
+    assert horizon.clients == expected.clients
+    assert horizon.products == expected.products
+    assert horizon.months == SALES_MONTHS
+    assert np.array_equal(horizon.demand, expected.demand)
@@ -0,0 +1,214 @@
+import numpy as np
+import pytest
+
+from portfolio import (SOLVERS, available_solvers, solve_with_portfolio, _read_glpk,
+                       _read_highs, get_glpsol_path, get_highs_path)
+from tables import Dataset
+from parameters import ModelParameters
+from model_builder import build_allocation_model
+from model_backends import solve_model
+from synthetic_data import synthetic_raw_data
+
+
+def small_model():
+    raw_data = synthetic_raw_data(30, 6, products_count=2, seed=2)
+    return build_allocation_model(ModelParameters(Dataset(raw_data)), 15, objective="fifo")
+
+
+def solution_files(tmp_path, text):
+    path = tmp_path / "model.sol"
+    path.write_text(text, encoding="ascii")
+    return {"solution": str(path)}
+
+
+# ------------------------------------------------------------
+# Lectores, con archivos de solución y logs guardados de cada solucionador
+# (el MPS minimiza el objetivo negado).
+
+GLPK_OPTIMAL = """\
+c Problem:
+c Rows:       2
+c Columns:    3
+c Non-zeros:  4
+c Status:     INTEGER OPTIMAL
+c Objective:  OBJ = -2.5 (MINimum)
+c
+s mip 2 3 o -2.5
+i 1 1
+i 2 350
+j 1 1
+j 2 0
+j 3 1
+e o f
+"""
+
+GLPK_STOPPED = """\
+s mip 2 3 f -1.5
+i 1 1
+i 2 200
+j 1 0
+j 2 1
+j 3 0
+e o f
+"""
+
+GLPK_STOPPED_LOG = """\
+Integer optimization begins...
++     2: mip =     not found yet >=              -inf        (1; 0)
++    40: mip =  -1.000000000e+00 >=  -3.000000000e+00  66.7% (5; 1)
++    81: mip =  -1.500000000e+00 >=  -2.750000000e+00  45.5% (7; 3)
+TIME LIMIT EXCEEDED; SEARCH TERMINATED
+"""
+
+GLPK_INFEASIBLE = """\
+s mip 2 3 n 0
+e o f
+"""
+
+
+def test_read_glpk_optimal(tmp_path):
+    status, objective, values, bound = _read_glpk(solution_files(tmp_path, GLPK_OPTIMAL),
+                                                  "", 3)
+
+    assert status == "Optimal"
+    assert objective == 2.5
+    assert values.tolist() == [1.0, 0.0, 1.0]
+    assert bound == 2.5
+
+
+def test_read_glpk_stopped_on_time_reads_bound_from_log(tmp_path):
+    status, objective, values, bound = _read_glpk(solution_files(tmp_path, GLPK_STOPPED),
+                                                  GLPK_STOPPED_LOG, 3)
+
+    assert status == "Feasible"
+    assert objective == 1.5
+    assert values.tolist() == [0.0, 1.0, 0.0]
+    assert bound == 2.75
+
+
+def test_read_glpk_infeasible(tmp_path):
+    status, objective, _, bound = _read_glpk(solution_files(tmp_path, GLPK_INFEASIBLE),
+                                             "", 3)
+
+    assert status == "Infeasible"
+    assert objective is None
+    assert bound is None
+
+
+HIGHS_OPTIMAL = """\
+Model status
+Optimal
+
+# Primal solution values
+Feasible
+Objective -2.5
+# Columns 3
+X0 1
+X1 0
+X2 1
+# Rows 2
+R0 1
+R1 350
+
+# Dual solution values
+None
+
+# Basis
+HiGHS v1
+None
+"""
+
+HIGHS_STOPPED = """\
+Model status
+Time limit reached
+
+# Primal solution values
+Feasible
+Objective -1.5
+# Columns 3
+X0 0
+X1 1
+X2 0
+# Rows 2
+R0 1
+R1 200
+"""
+
+HIGHS_STOPPED_LOG = """\
+Solving report
+  Status            Time limit reached
+  Primal bound      -1.5
+  Dual bound        -2.75
+  Gap               83.33% (tolerance: 0.01%)
+"""
+
+
+def test_read_highs_optimal(tmp_path):
+    status, objective, values, bound = _read_highs(solution_files(tmp_path, HIGHS_OPTIMAL),
+                                                   "", 3)
+
+    assert status == "Optimal"
+    assert objective == 2.5
+    assert values.tolist() == [1.0, 0.0, 1.0]
+    assert bound == 2.5
+
+
+def test_read_highs_time_limit_reads_bound_from_log(tmp_path):
+    status, objective, values, bound = _read_highs(solution_files(tmp_path, HIGHS_STOPPED),
+                                                   HIGHS_STOPPED_LOG, 3)
+
+    assert status == "Time limit reached"
+    assert objective == 1.5
+    assert values.tolist() == [0.0, 1.0, 0.0]
+    assert bound == 2.75
+
+
+# ------------------------------------------------------------
+# Selección de corredores.
+
+def without_executable(monkeypatch, *names):
+    for name in names:
+        _, command, reader, free = SOLVERS[name]
+        monkeypatch.setitem(SOLVERS, name, (lambda: None, command, reader, free))
+
+
+def test_opt_in_solvers_only_run_when_requested():
+    assert "cbc-strategy2" not in available_solvers()
+    assert "cbc-strategy2" in available_solvers(include_opt_in=True)
+
+
+def test_missing_binaries_fall_back_to_cbc(monkeypatch):
+    without_executable(monkeypatch, "glpk", "highs")
+
+    model = small_model()
+    result = solve_with_portfolio(model, solvers=["glpk", "highs", "cbc"], time_limit=10)
+    expected = solve_model(model, "cbc", time_limit=10)
+
+    assert result.backend == "portfolio/cbc"
+    assert result.status == "Optimal"
+    assert np.isclose(result.objective, expected.objective)
+
+
+def test_no_solver_available(monkeypatch):
+    without_executable(monkeypatch, *SOLVERS)
+
+    assert available_solvers(include_opt_in=True) == []
+
+    with pytest.raises(FileNotFoundError):
+        solve_with_portfolio(small_model())
+
+
+# Con el ejecutable instalado, cada lector contra una resolución real.
+@pytest.mark.parametrize("name, get_executable", [("glpk", get_glpsol_path),
+                                                  ("highs", get_highs_path)])
+def test_installed_solver_matches_cbc(name, get_executable):
+    if get_executable() is None:
+        pytest.skip(f"{name} no está instalado")
+
+    model = small_model()
+    result = solve_with_portfolio(model, solvers=[name], time_limit=10)
+    expected = solve_model(model, "cbc", time_limit=10)
+
+    assert result.backend == f"portfolio/{name}"
+    assert np.isclose(result.objective, expected.objective)
+    assert np.isclose(model.objective @ result.values, result.objective)
@@ -0,0 +1,30 @@
+import tracemalloc
+
+from profiling import RunProfile
+
+
+def test_phase_traces_memory_only_inside_the_phase():
+    profile = RunProfile("prueba")
+
+    with profile.phase("lista"):
+        assert tracemalloc.is_tracing()
+        assert len([0] * 100_000) == 100_000
+
+    assert not tracemalloc.is_tracing()
+    assert profile.phases[0]["peak_mb"] > 0.5
+
+    profile.add_phase("solucionador", 1.5)
+    assert profile.phases[1] == {"phase": "solucionador", "seconds": 1.5, "peak_mb": None}
+
+
+def test_phase_keeps_tracing_started_outside():
+    tracemalloc.start()
+
+    try:
+        with RunProfile("prueba").phase("fase"):
+            pass
+
+        assert tracemalloc.is_tracing()
+
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,111 @@
+import copy
+
+import numpy as np
+
+from excel_batches import Batch
+from tables import Dataset
+from parameters import ModelParameters
+from model_builder import build_allocation_model, SolveResult
+from model_backends import solve_model
+from decomposition import find_components
+import session as session_module
+from session import PlanningSession, pair_keys, weakest_status
+from synthetic_data import synthetic_raw_data
+
+
+# Varias componentes conexas: pocos clientes aptos por lote.
+def small_raw_data(seed=4):
+    return synthetic_raw_data(60, 8, products_count=4, aptitude_rate=0.15, seed=seed,
+                              mass_range=(50, 400))
+
+
+# Agrega una copia de un lote con una fecha nave anterior a todas: cambia
+# max(T) y, sin escalas fijas, los coeficientes fifo de todas las columnas.
+def with_older_batch(raw_data, template_id):
+    template = raw_data["batches"][template_id]
+    edited = {"batches": dict(raw_data["batches"]),
+              "requests": raw_data["requests"],
+              "importance": raw_data["importance"]}
+
+    oldest = min(batch.shipping_date_epoch for batch in raw_data["batches"].values())
+    edited["batches"]["OLD1"] = Batch.from_parsed(
+        center_name=template.center_name,
+        mill=template.mill,
+        shipping_date_epoch=oldest - 200 * 86_400,
+        batch_id="OLD1",
+        product_id=template.product_id,
+        mass=template.mass,
+        sellable_clients=template.sellable_clients
+    )
+
+    return edited
+
+
+def test_fifo_update_keeps_coefficients_of_existing_pairs():
+    raw_data = small_raw_data()
+    session = PlanningSession(objective="fifo", time_limit=30)
+    session.load(raw_data)
+
+    previous = dict(zip(pair_keys(session.model), session.model.objective.tolist()))
+    assert len(np.unique(find_components(session.model))) > 1
+
+    session.update(with_older_batch(raw_data, next(iter(raw_data["batches"]))))
+    current = dict(zip(pair_keys(session.model), session.model.objective.tolist()))
+
+    shared = previous.keys() & current.keys()
+    assert shared
+    assert all(np.isclose(previous[key], current[key]) for key in shared)
+
+
+def test_fifo_update_matches_from_scratch_solve():
+    raw_data = small_raw_data()
+    session = PlanningSession(objective="fifo", time_limit=30)
+    session.load(raw_data)
+
+    edited = with_older_batch(raw_data, next(iter(raw_data["batches"])))
+    incremental = session.update(copy.copy(edited))
+
+    model = build_allocation_model(ModelParameters(Dataset(edited), now=session.now), 15,
+                                   objective="fifo", scales=session.scales)
+    from_scratch = solve_model(model, "cbc", time_limit=30)
+
+    assert incremental.status == "Optimal"
+    assert np.isclose(incremental.objective, from_scratch.objective)
+
+
+def test_weakest_status():
+    assert weakest_status(["Optimal", "Optimal"]) == "Optimal"
+    assert weakest_status(["Optimal", "Stopped on time", "Optimal"]) == "Stopped on time"
+    assert weakest_status(["Feasible", "Not Solved"]) == "Not Solved"
+    assert weakest_status([]) == "Optimal"
+
+
+# Un solucionador que devuelve la solución inicial sin demostrar nada.
+def unproven_solve(model, backend, initial_values=None, **options):
+    return SolveResult(backend=backend, status="Stopped on time",
+                       objective=float(model.objective @ initial_values),
+                       values=initial_values, build_seconds=0.0, solve_seconds=0.0)
+
+
+def test_update_reports_weakest_status_of_kept_components(monkeypatch):
+    raw_data = small_raw_data()
+    session = PlanningSession(objective="fifo", time_limit=30)
+
+    monkeypatch.setattr(session_module, "solve_model", unproven_solve)
+    assert session.load(raw_data).status == "Stopped on time"
+
+    solved_columns = []
+
+    def recording_solve(model, backend, **options):
+        solved_columns.append(model.variables_count)
+        return solve_model(model, backend, **options)
+
+    monkeypatch.setattr(session_module, "solve_model", recording_solve)
+
+    edited = with_older_batch(raw_data, next(iter(raw_data["batches"])))
+    result = session.update(edited)
+
+    # Solo se re-resolvió la componente del lote nuevo; las demás conservan
+    # el estado "Stopped on time" de la carga.
+    assert 0 < sum(solved_columns) < session.model.variables_count
+    assert result.status == "Stopped on time"
@@ -0,0 +1,24 @@
+import pytest
+
+from tables import Dataset
+from parameters import ModelParameters
+from synthetic_data import synthetic_raw_data
+
+
+@pytest.mark.parametrize("products_count", [1, 2, 3, 10])
+def test_synthetic_raw_data_with_few_products(products_count):
+    raw_data = synthetic_raw_data(50, 20, products_count=products_count, seed=1)
+
+    products = {batch.product_id for batch in raw_data["batches"].values()}
+    requested = {}
+
+    for request in raw_data["requests"].values():
+        requested.setdefault(request.client_id, set()).add(request.product_id)
+
+    assert len(products) <= products_count
+    assert len(requested) == 20
+    assert all(1 <= len(client_products) <= min(3, products_count)
+               for client_products in requested.values())
+
+    parameters = ModelParameters(Dataset(raw_data))
+    assert len(parameters.batches) == 50
@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+
+import excel_cache
+from excel_cache import CODECS, CACHE_DIR, INDEX_FILE, evict
+from synthetic_data import synthetic_raw_data, write_synthetic_workbooks
+from tables import Dataset, get_raw_data
+
+
+def assert_same_raw_data(expected, actual):
+    for kind, (encode, _) in CODECS.items():
+        expected_arrays, actual_arrays = encode(expected[kind]), encode(actual[kind])
+
+        assert expected_arrays.keys() == actual_arrays.keys()
+        assert all(np.array_equal(expected_arrays[key], actual_arrays[key])
+                   for key in expected_arrays)
+
+
+def test_parallel_cached_load_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = write_synthetic_workbooks(synthetic_raw_data(40, 10, products_count=2), ".")
+
+    sequential = get_raw_data(use_cache=False)
+    parallel = get_raw_data(parallel=True)
+
+    assert_same_raw_data(sequential, parallel)
+
+    # El índice tiene la huella de los tres libros.
+    with open(os.path.join(CACHE_DIR, INDEX_FILE), encoding="utf-8") as file:
+        index = json.load(file)
+
+    assert set(index) == {os.path.abspath(path) for path in paths.values()}
+
+    # Segunda lectura desde el caché, también a través de `Dataset`.
+    dataset = Dataset(parallel=True)
+    assert sorted(dataset.batches) == sorted(batch.batch_id for batch in
+                                             sequential["batches"].values())
+
+
+def write_entries(directory, names):
+    for age, name in enumerate(reversed(names)):
+        path = directory / name
+        path.write_bytes(b"0" * 1024)
+        os.utime(path, ns=(10 ** 18 - age * 10 ** 9,) * 2)
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path):
+    write_entries(tmp_path, ["a.npz", "b.npz", "c.npz"])
+
+    assert evict(str(tmp_path), max_bytes=1024) == ["a.npz", "b.npz"]
+    assert sorted(os.listdir(tmp_path)) == ["c.npz"]
+
+
+def test_evict_ignores_entries_removed_by_another_process(tmp_path, monkeypatch):
+    write_entries(tmp_path, ["a.npz", "b.npz"])
+
+    def removed_elsewhere(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(excel_cache.os, "remove", removed_elsewhere)
+
+    assert evict(str(tmp_path), max_bytes=0) == []